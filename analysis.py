@@ -0,0 +1,124 @@
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+
+from skills import get_skill_engine
+from model_registry import get_stop_words
+from metrics import stage
+
+# ATS criteria and the keywords that satisfy them (matched as substrings)
+ATS_CRITERIA = {
+    "contact information": ["phone", "email", "linkedin", "github"],
+    "education": ["bachelor", "master", "phd", "degree", "university", "college"],
+    "experience": ["experience", "worked at", "position", "years"],
+    "skills": ["skills", "technologies", "expertise"],
+    "keywords": ["python", "java", "ml", "data science", "tensorflow", "react", "aws", "sql"],
+    "no images": ["jpg", "png", "gif", "image"],
+    "proper formatting": ["pdf", "docx"],
+    "bullet points": [],  # matched by the bullet group below
+}
+
+# Section names checked by the ATS helpers
+SECTIONS = ["contact", "education", "experience", "skills", "projects"]
+
+_LITERALS = sorted({kw for keywords in ATS_CRITERIA.values() for kw in keywords} | set(SECTIONS), key=len, reverse=True)
+
+# One combined scan over the lowercased text. At a given position the first
+# alternative that matches wins, so experience ranges are tried before single
+# year counts.
+_SCAN = re.compile(
+    r"(?P<range>(?P<range_start>\d+)\s*-\s*(?P<range_end>\d+)\s*years?)"
+    r"|(?P<present>(?P<present_start>\d+)\s*-\s*(?:present|current))"
+    r"|(?P<since>since\s*(?P<since_year>\d{4}))"
+    r"|(?P<years>(?P<years_count>\d+)\s*(?:\+?\s*years?|yrs?|y))"
+    r"|(?P<bullet>•|\d+\.\s)"
+    r"|(?P<literal>" + "|".join(re.escape(literal) for literal in _LITERALS) + ")"
+)
+_WORD = re.compile(r"\b\w+\b")
+
+
+@dataclass(frozen=True)
+class ResumeAnalysis:
+    """
+    Every text feature of a resume, computed from a single scan.
+
+    Instances are shared through the analyze_resume cache, so every field is
+    immutable; helpers hand out copies.
+    """
+
+    skills: tuple
+    experience_years: int  # ranges count as their midpoint, "since YYYY" as years until now
+    experience_span_years: int  # ranges count as their length, "YYYY - present" as years until now
+    ats_hits: frozenset  # satisfied ATS_CRITERIA names
+    sections: frozenset  # SECTIONS mentioned anywhere in the text
+    section_headings: frozenset  # SECTIONS present as whole words
+    keyword_counts: tuple  # (word, count) of non-stopword words longer than two characters, most common first
+
+    def ats_result(self):
+        """(ats_score, ats_feedback) for the criteria in ATS_CRITERIA."""
+        missing_criteria = [key for key in ATS_CRITERIA if key not in self.ats_hits]
+        ats_score = ((len(ATS_CRITERIA) - len(missing_criteria)) / len(ATS_CRITERIA)) * 100
+        ats_feedback = "Missing: " + ", ".join(missing_criteria) if missing_criteria else "Resume is ATS-friendly."
+        return round(ats_score, 2), ats_feedback
+
+
+@lru_cache(maxsize=64)
+def analyze_resume(text):
+    """
+    Lowercases and tokenizes the text once, runs one combined regex scan and
+    returns all resume features together. Results are cached per text so the
+    thin wrappers in utils, matcher and resume_parser share one analysis.
+    """
+    with stage("analysis"):
+        return _analyze(text)
+
+
+def _analyze(text):
+    lowered = text.lower()
+    current_year = datetime.now().year
+
+    years = []  # values for experience_years
+    spans = []  # values for experience_span_years
+    literals = set()
+    has_bullets = False
+    for match in _SCAN.finditer(lowered):
+        kind = match.lastgroup
+        if match.group("range"):
+            start, end = int(match.group("range_start")), int(match.group("range_end"))
+            years += [(start + end) // 2, end]
+            spans += [end - start, end]
+            literals.add("years")
+        elif match.group("present"):
+            spans.append(current_year - int(match.group("present_start")))
+        elif match.group("since"):
+            years.append(current_year - int(match.group("since_year")))
+        elif match.group("years"):
+            count = int(match.group("years_count"))
+            years.append(count)
+            spans.append(count)
+            if "year" in match.group("years"):
+                literals.add("years")
+        elif kind == "bullet":
+            has_bullets = True
+        else:
+            literals.add(match.group("literal"))
+
+    ats_hits = {name for name, keywords in ATS_CRITERIA.items() if literals.intersection(keywords)}
+    if has_bullets:
+        ats_hits.add("bullet points")
+
+    words = _WORD.findall(lowered)
+    stop_words = get_stop_words()
+    word_set = set(words)
+
+    return ResumeAnalysis(
+        skills=tuple(get_skill_engine().extract(lowered)),
+        experience_years=max(years) if years else 0,
+        experience_span_years=max(spans) if spans else 0,
+        ats_hits=frozenset(ats_hits),
+        sections=frozenset(section for section in SECTIONS if section in literals),
+        section_headings=frozenset(section for section in SECTIONS if section in word_set),
+        keyword_counts=tuple(Counter(word for word in words if word not in stop_words and len(word) > 2).most_common()),
+    )
@@ -2,9 +2,16 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from database import User, SessionLocal  # Import the User model and database session
+import asyncio
 import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 
 # Secure JWT Secret Key
@@ -12,6 +19,14 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key_here")  # Use environment
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60  # Token expiration time
 
+# Resolved users are reused for this long; changes made by other processes
+# (or by bulk UPDATEs that skip ORM events) show up after at most the TTL
+AUTH_CACHE_TTL_SECONDS = float(os.environ.get("AUTH_CACHE_TTL_SECONDS", "30"))
+AUTH_CACHE_SIZE = int(os.environ.get("AUTH_CACHE_SIZE", "10000"))
+# Threads reserved for bcrypt, so logins neither block the event loop nor
+# queue behind other work in the default executor
+BCRYPT_WORKERS = int(os.environ.get("BCRYPT_WORKERS", "2"))
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 # Password hashing context
@@ -25,6 +40,18 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifies a password against a hash."""
     return pwd_context.verify(plain_password, hashed_password)
 
+_bcrypt_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the bcrypt executor, off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_bcrypt_executor, hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the bcrypt executor, off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _bcrypt_executor, verify_password, plain_password, hashed_password
+    )
+
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     """Generates a JWT access token with an expiration time."""
     to_encode = data.copy()
@@ -40,6 +67,78 @@ def get_db():
     finally:
         db.close()
 
+# What the cache keeps: plain values, never an ORM object bound to another request's session
+CachedUser = namedtuple("CachedUser", ["id", "username", "is_active"])
+
+class UserCache:
+    """Bounded LRU of resolved users by token subject, each entry valid for `ttl` seconds."""
+
+    def __init__(self, ttl=AUTH_CACHE_TTL_SECONDS, max_entries=AUTH_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # username -> (expires_at, CachedUser)
+        self._lock = threading.Lock()
+
+    def get(self, username):
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[username]
+                return None
+            self._entries.move_to_end(username)
+            return entry[1]
+
+    def put(self, username, user):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[username] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username):
+        with self._lock:
+            self._entries.pop(username, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+user_cache = UserCache()
+
+# Activating or deactivating a user takes effect on the next request: the
+# entry is dropped when the attribute changes and again once the change is
+# committed, so a lookup racing the commit cannot keep the old state cached
+@event.listens_for(User.is_active, "set")
+def _on_is_active_change(target, value, oldvalue, initiator):
+    if value == oldvalue or target.username is None:
+        return
+    user_cache.invalidate(target.username)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("auth_invalidate", set()).add(target.username)
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    for username in session.info.pop("auth_invalidate", ()):
+        user_cache.invalidate(username)
+
+@event.listens_for(User, "after_delete")
+def _on_user_delete(mapper, connection, target):
+    user_cache.invalidate(target.username)
+
+def _attach_cached_user(db, cached):
+    """A User in `db` built from a cache entry without a query; other columns load on access."""
+    user = User()
+    # set_committed_value skips the is_active "set" event, which would drop the entry
+    for key, value in cached._asdict().items():
+        set_committed_value(user, key, value)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     """Verifies user authentication token and fetches user from DB."""
     credentials_exception = HTTPException(
@@ -52,8 +151,15 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         username: str = payload.get("sub")
         if not username:
             raise credentials_exception
-        user = db.query(User).filter(User.username == username).first()
-        if not user:
+        cached = user_cache.get(username)
+        if cached is None:
+            user = db.query(User).filter(User.username == username).first()
+            if not user:
+                raise credentials_exception
+            user_cache.put(username, CachedUser(user.id, user.username, user.is_active))
+        else:
+            user = _attach_cached_user(db, cached)
+        if user.is_active is False:
             raise credentials_exception
         return user  # Return the User object instead of a dictionary
     except JWTError:
@@ -61,8 +167,8 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
 
 
 async def authenticate_user(username: str, password: str, db: Session):
-    """Validates user login credentials."""
+    """Validates user login credentials; bcrypt runs on its own executor."""
     user = db.query(User).filter(User.username == username).first()
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await verify_password_async(password, user.hashed_password):
         return None  # Return None instead of raising an exception
     return user
@@ -0,0 +1,116 @@
+"""
+Per-request cost of authentication.
+
+- token resolution: auth.get_current_user with the user cache disabled
+  (JWT decode + a users query every call) and enabled
+- login: event loop stall and wall time for concurrent logins when bcrypt
+  runs inline on the loop versus on the bcrypt executor
+
+    python -m benchmarks.bench_auth --requests 5000 --logins 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+# Keep benchmark users out of the application database
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_auth.db")
+
+import auth  # noqa: E402
+from benchmarks.common import summarize  # noqa: E402
+from database import SessionLocal, User  # noqa: E402
+
+USERNAME = "bench-user"
+PASSWORD = "bench-password"
+
+
+def ensure_user(db):
+    user = db.query(User).filter(User.username == USERNAME).first()
+    if user is None:
+        user = User(username=USERNAME, hashed_password=auth.hash_password(PASSWORD), is_active=True)
+        db.add(user)
+        db.commit()
+    return user
+
+
+def resolve_tokens(token, requests, ttl):
+    """Latencies of get_current_user, each call with its own session like a request."""
+    auth.user_cache.ttl = ttl
+    auth.user_cache.clear()
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            auth.get_current_user(token, db)
+        finally:
+            db.close()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def _login_inline(db):
+    # The previous behaviour: bcrypt on the event loop thread
+    user = db.query(User).filter(User.username == USERNAME).first()
+    return user if auth.verify_password(PASSWORD, user.hashed_password) else None
+
+
+async def measure_logins(login, logins, db):
+    """Wall time of `logins` concurrent logins and the longest event loop stall meanwhile."""
+    stalls = []
+    stop = asyncio.Event()
+
+    async def ticker(interval=0.005):
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            stalls.append(time.perf_counter() - start - interval)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    results = await asyncio.gather(*[login(db) for _ in range(logins)])
+    wall = time.perf_counter() - start
+    await asyncio.sleep(0.05)
+    stop.set()
+    await task
+    assert all(results), "login failed"
+    return {
+        "wall_ms": round(wall * 1000, 1),
+        "max_loop_stall_ms": round(max(stalls) * 1000, 1),
+        "per_login_ms": round(wall / logins * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="token resolutions per configuration")
+    parser.add_argument("--logins", type=int, default=8, help="concurrent logins")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        ensure_user(db)
+        token = auth.create_access_token({"sub": USERNAME})
+        ttl = auth.user_cache.ttl
+        report = {
+            "token_resolution": {
+                "uncached": summarize(resolve_tokens(token, args.requests, ttl=0)),
+                "cached": summarize(resolve_tokens(token, args.requests, ttl=ttl or 30)),
+            },
+            "login": {
+                "inline_bcrypt": asyncio.run(measure_logins(_login_inline, args.logins, db)),
+                "bcrypt_executor": asyncio.run(measure_logins(
+                    lambda session: auth.authenticate_user(USERNAME, PASSWORD, session), args.logins, db
+                )),
+                "bcrypt_workers": auth.BCRYPT_WORKERS,
+            },
+        }
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compares resumes/second of /match-resume/ (one file per request) against
+/match-resumes/batch (all files in one request).
+
+    python -m benchmarks.bench_batch --count 50 --batch-size 32
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+# Use a scratch database and disable the embedding cache so every resume is encoded
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_batch.db")
+os.environ["EMBEDDING_CACHE_PATH"] = ""
+os.environ["EMBEDDING_CACHE_SIZE"] = "0"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from benchmarks.common import synthetic_resume, write_docx, SAMPLE_JOB_DESCRIPTION  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    from main import app
+    from model_registry import warm_up
+    warm_up()
+
+    with tempfile.TemporaryDirectory() as tmp, TestClient(app) as client:
+        # Each phase gets its own documents, never stored before (the database
+        # persists between runs), so neither reuses the other's stored features
+        # and embeddings
+        first_seed = int(time.time() * 1000)
+        single_paths, batch_paths = (
+            [
+                write_docx(synthetic_resume(seed, sections=4), os.path.join(tmp, f"bench_{seed}.docx"))
+                for seed in range(first_seed + offset, first_seed + offset + args.count)
+            ]
+            for offset in (0, args.count)
+        )
+
+        start = time.perf_counter()
+        for path in single_paths:
+            with open(path, "rb") as f:
+                response = client.post(
+                    "/match-resume/",
+                    files={"file": (os.path.basename(path), f)},
+                    data={"job_description": SAMPLE_JOB_DESCRIPTION},
+                )
+            response.raise_for_status()
+        single_elapsed = time.perf_counter() - start
+
+        handles = [open(path, "rb") for path in batch_paths]
+        try:
+            start = time.perf_counter()
+            response = client.post(
+                "/match-resumes/batch",
+                files=[("files", (os.path.basename(path), f)) for path, f in zip(batch_paths, handles)],
+                data={"job_description": SAMPLE_JOB_DESCRIPTION, "batch_size": str(args.batch_size)},
+            )
+            response.raise_for_status()
+            batch_elapsed = time.perf_counter() - start
+        finally:
+            for f in handles:
+                f.close()
+
+    print(json.dumps({
+        "resumes": args.count,
+        "single_resumes_per_sec": round(args.count / single_elapsed, 2),
+        "batch_resumes_per_sec": round(args.count / batch_elapsed, 2),
+        "speedup": round(single_elapsed / batch_elapsed, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
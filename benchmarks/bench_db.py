@@ -0,0 +1,140 @@
+"""
+Resume inserts per second under concurrent writers.
+
+Each configuration runs in a fresh subprocess against its own SQLite file,
+with N writer threads each storing M scored resumes the way /match-resume/
+does (store_scored, commit, vector index add):
+
+- legacy: rollback journal, synchronous=FULL, SQLite's default lock wait,
+  one commit plus a refresh() round-trip per resume
+- tuned: the database.py defaults (WAL, synchronous=NORMAL, busy timeout,
+  pool sizing), one commit per resume
+- write_behind: tuned, with results grouped by the write_behind committer
+
+    python -m benchmarks.bench_db --writers 16 --inserts 100
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+CONFIGS = {
+    "legacy": {
+        "SQLITE_JOURNAL_MODE": "DELETE", "SQLITE_SYNCHRONOUS": "FULL", "SQLITE_BUSY_TIMEOUT_MS": "5000",
+        "SQLITE_CACHE_SIZE_KB": "2000", "SQLITE_MMAP_SIZE_MB": "0", "DB_POOL_SIZE": "5",
+    },
+    "tuned": {},
+    "write_behind": {"WRITE_BEHIND": "1"},
+}
+
+
+def _entry(seed):
+    import numpy as np
+    from benchmarks.common import synthetic_resume
+    from tfidf_model import term_counts
+
+    text = synthetic_resume(seed, sections=2)
+    result = {
+        "skills": ["python", "sql"], "experience_years": 3.0, "match_score": 50.0,
+        "job_ranking": 40.0, "ats_score": 80.0, "ats_feedback": "ok",
+    }
+    features = {**result, "text": text, "term_counts": term_counts(text)}
+    embedding = np.random.default_rng(seed).normal(size=384).astype(np.float32)
+    return (f"resume_{seed}.pdf", f"{seed:064x}", result, embedding, features, "Python engineer with SQL")
+
+
+def run_config(config, writers, inserts):
+    """Runs inside the subprocess; prints one JSON report."""
+    from benchmarks.common import summarize
+    from database import SessionLocal
+    from migrations import migrate
+    from pipeline import store_scored
+    from vector_index import get_vector_index
+    import write_behind
+
+    migrate()
+    entries = [[_entry(w * inserts + i) for i in range(inserts)] for w in range(writers)]
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def store_direct(entry):
+        db = SessionLocal()
+        try:
+            resume = store_scored(db, [entry])[0]
+            db.commit()
+            if config == "legacy":
+                db.refresh(resume)
+            get_vector_index().add([resume.id], [entry[3]])
+        finally:
+            db.close()
+
+    def writer(batch):
+        for entry in batch:
+            start = time.perf_counter()
+            try:
+                if write_behind.WRITE_BEHIND:
+                    write_behind.get_committer().submit(entry).result()
+                else:
+                    store_direct(entry)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+            except Exception as e:
+                with lock:
+                    errors.append(f"{type(e).__name__}: {e}"[:200])
+
+    threads = [threading.Thread(target=writer, args=(batch,)) for batch in entries]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    write_behind.shutdown_committer()
+
+    report = {
+        "config": config,
+        "inserts": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "inserts_per_sec": round(len(latencies) / wall, 1),
+        "latency": {key: value for key, value in summarize(latencies).items() if key != "items_per_sec"},
+    }
+    print(json.dumps(report))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--inserts", type=int, default=100, help="resumes stored by each writer")
+    parser.add_argument("--configs", nargs="+", choices=list(CONFIGS), default=list(CONFIGS))
+    parser.add_argument("--run-config", choices=list(CONFIGS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_config:
+        run_config(args.run_config, args.writers, args.inserts)
+        return
+
+    reports = []
+    for config in args.configs:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                **os.environ, **CONFIGS[config],
+                "DATABASE_URL": f"sqlite:///{tmp}/bench.db",
+                "VECTOR_INDEX_PATH": os.path.join(tmp, "vectors"),
+            }
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_db", "--run-config", config,
+                 "--writers", str(args.writers), "--inserts", str(args.inserts)],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            reports.append(json.loads(output.strip().splitlines()[-1]))
+    print(json.dumps({"writers": args.writers, "inserts_per_writer": args.inserts, "results": reports}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Throughput, latency and accuracy of each embedding inference profile.
+
+Every profile in EMBEDDING_PROFILES encodes the same fixture set: synthetic
+resumes of several lengths plus the sample job description. The accuracy
+guard compares each profile's resume/job cosine scores with fp32 and fails
+when the largest deviation exceeds --max-deviation.
+
+    python -m benchmarks.bench_embedder --threads 4 --interop-threads 1
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import synthetic_resume, summarize, timed, SAMPLE_JOB_DESCRIPTION
+from model_registry import EMBEDDING_PROFILES, load_embedding_model, configure_torch_threads
+from vector_index import normalize_rows
+
+
+def fixture_texts(count):
+    """Resumes of mixed length, so length-aware batching has something to sort."""
+    return [synthetic_resume(seed, sections=1 + seed % 12) for seed in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=20, help="single-text encodes per profile")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    parser.add_argument("--interop-threads", type=int, default=None, help="torch inter-op threads")
+    parser.add_argument("--max-deviation", type=float, default=0.02,
+                        help="largest allowed |cosine(profile) - cosine(fp32)|")
+    args = parser.parse_args()
+
+    if args.threads:
+        configure_torch_threads(args.threads, args.interop_threads)
+
+    texts = fixture_texts(args.documents)
+    report = {"documents": len(texts), "batch_size": args.batch_size, "profiles": {}}
+    scores = {}
+    for profile in EMBEDDING_PROFILES:
+        model = load_embedding_model(profile)
+        model.encode(["warm up"])
+
+        # Single-text latency, as seen by one /match-resume/ request
+        single = summarize(timed(model.encode, [texts[0]], repeat=args.repeat))
+
+        start = time.perf_counter()
+        embeddings = model.encode(texts + [SAMPLE_JOB_DESCRIPTION], batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+
+        embeddings = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        scores[profile] = embeddings[:-1] @ embeddings[-1]
+        report["profiles"][profile] = {
+            "single_text": single,
+            "bulk_documents_per_sec": round(len(texts) / elapsed, 2),
+            "bulk_ms_per_document": round(elapsed / len(texts) * 1000, 3),
+        }
+
+    failed = []
+    for profile in EMBEDDING_PROFILES:
+        deviation = float(np.max(np.abs(scores[profile] - scores["fp32"])))
+        report["profiles"][profile]["max_cosine_deviation"] = round(deviation, 5)
+        if deviation > args.max_deviation:
+            failed.append(profile)
+
+    print(json.dumps(report, indent=2))
+    if failed:
+        print(f"Cosine deviation above {args.max_deviation}: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
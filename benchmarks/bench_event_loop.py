@@ -0,0 +1,90 @@
+"""
+Measures latency of a lightweight endpoint (/ready) while uploads are in flight.
+
+If CPU-bound work ran on the event loop, the p99 under load would grow with
+the upload time; with the worker pool it should stay close to the idle p99.
+
+    python -m benchmarks.bench_event_loop --uploads 20 --concurrency 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_event_loop.db")
+
+import httpx  # noqa: E402
+
+from benchmarks.common import synthetic_resume, write_docx, summarize, SAMPLE_JOB_DESCRIPTION  # noqa: E402
+
+
+async def probe(client, stop, latencies, interval=0.05):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/ready")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def upload_loop(client, paths, statuses):
+    for path in paths:
+        with open(path, "rb") as f:
+            response = await client.post(
+                "/match-resume/",
+                files={"file": (os.path.basename(path), f.read())},
+                data={"job_description": SAMPLE_JOB_DESCRIPTION},
+            )
+        statuses.append(response.status_code)
+
+
+async def run(args, paths):
+    from main import app
+    from workers import get_worker_pool
+
+    get_worker_pool()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        idle = []
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, stop, idle))
+        await asyncio.sleep(2)
+        stop.set()
+        await task
+
+        loaded = []
+        statuses = []
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, stop, loaded))
+        chunks = [paths[i::args.concurrency] for i in range(args.concurrency)]
+        await asyncio.gather(*[upload_loop(client, chunk, statuses) for chunk in chunks])
+        stop.set()
+        await task
+
+    return {
+        "idle": summarize(idle),
+        "under_upload_load": summarize(loaded),
+        "upload_statuses": {str(code): statuses.count(code) for code in sorted(set(statuses))},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    from model_registry import warm_up
+    warm_up()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [
+            write_docx(synthetic_resume(i, sections=6), os.path.join(tmp, f"load_{i}.docx"))
+            for i in range(args.uploads)
+        ]
+        print(json.dumps(asyncio.run(run(args, paths)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
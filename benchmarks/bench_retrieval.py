@@ -0,0 +1,119 @@
+"""
+Recall and latency of the two-stage screening cascade (retrieval.py).
+
+Builds a synthetic pool of stored resumes, then for several job
+descriptions compares exhaustive scoring of the whole pool with the
+cascade at each candidate count K:
+
+- recall@K: share of the exhaustive top-n also returned by the cascade
+- latency of the prefilter, of the rerank, and of exhaustive scoring
+
+    python -m benchmarks.bench_retrieval --resumes 5000 --candidates 50 200 1000 --top-n 10
+"""
+import argparse
+import json
+import os
+import time
+
+# Keep the benchmark corpus out of the application database
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_retrieval.db")
+
+from benchmarks.common import synthetic_resume, summarize, _SKILLS  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from embedding_cache import encode_texts  # noqa: E402
+from migrations import migrate  # noqa: E402
+from pipeline import rescore_features  # noqa: E402
+from retrieval import CandidateIndex  # noqa: E402
+from tfidf_model import get_tfidf_model, record_documents, term_counts  # noqa: E402
+from utils import extract_skills, extract_experience, ats_screening  # noqa: E402
+
+
+def build_pool(count):
+    """(resume_id, filename, features) rows shaped like feature_store output."""
+    texts = [synthetic_resume(seed, sections=1 + seed % 8) for seed in range(count)]
+    embeddings = encode_texts(texts)
+    rows = []
+    for i, (text, embedding) in enumerate(zip(texts, embeddings)):
+        ats_score, ats_feedback = ats_screening(text)
+        rows.append((i + 1, f"resume_{i}.docx", {
+            "text": text,
+            "skills": extract_skills(text),
+            "experience_years": extract_experience(text),
+            "ats_score": ats_score,
+            "ats_feedback": ats_feedback,
+            "embedding": embedding,
+            "term_counts": term_counts(text),
+        }))
+    return rows
+
+
+def job_descriptions(count):
+    return [
+        f"Hiring an engineer with {3 + i % 5}+ years of experience in "
+        f"{', '.join(_SKILLS[(i * 3 + j) % len(_SKILLS)] for j in range(4))}."
+        for i in range(count)
+    ]
+
+
+def top_ids(results, n):
+    return [r["id"] for r in sorted(results, key=lambda r: r["match_score"], reverse=True)[:n]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, default=10, help="job descriptions to screen")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--top-n", type=int, default=10)
+    args = parser.parse_args()
+
+    migrate()
+    rows = build_pool(args.resumes)
+    jobs = job_descriptions(args.jobs)
+
+    # Seed the corpus document frequencies the prefilter uses
+    db = SessionLocal()
+    try:
+        record_documents(db, {f"bench-{resume_id}": features["term_counts"] for resume_id, _, features in rows})
+        db.commit()
+    finally:
+        db.close()
+    get_tfidf_model().refresh()
+
+    index = CandidateIndex()
+    index.add([(resume_id, features) for resume_id, _, features in rows])
+    index.prefilter_scores(jobs[0])  # builds the matrices
+    by_id = {row[0]: row for row in rows}
+
+    exhaustive_latencies = []
+    truth = {}
+    for jd in jobs:
+        start = time.perf_counter()
+        truth[jd] = top_ids(rescore_features(rows, jd), args.top_n)
+        exhaustive_latencies.append(time.perf_counter() - start)
+
+    report = {"resumes": len(rows), "jobs": len(jobs), "top_n": args.top_n,
+              "exhaustive": summarize(exhaustive_latencies), "cascade": {}}
+    for k in args.candidates:
+        prefilter, rerank, recalls = [], [], []
+        for jd in jobs:
+            start = time.perf_counter()
+            candidate_ids = index.candidates(jd, k)
+            prefilter.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            found = top_ids(rescore_features([by_id[i] for i in candidate_ids], jd), args.top_n)
+            rerank.append(time.perf_counter() - start)
+            recalls.append(len(set(found) & set(truth[jd])) / len(truth[jd]))
+        report["cascade"][f"K={k}"] = {
+            "recall_at_k": round(sum(recalls) / len(recalls), 4),
+            "prefilter": summarize(prefilter),
+            "rerank": summarize(rerank),
+            "total_mean_ms": round((sum(prefilter) + sum(rerank)) / len(jobs) * 1000, 3),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
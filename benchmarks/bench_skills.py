@@ -0,0 +1,77 @@
+"""
+Shows how skill extraction scales with taxonomy size (40 -> 10,000 skills).
+
+Compares the compiled SkillEngine (exact and fuzzy) against the previous
+per-token fuzzywuzzy.extractOne approach when fuzzywuzzy is installed.
+
+    python -m benchmarks.bench_skills
+"""
+import argparse
+import json
+import random
+import string
+import time
+
+from benchmarks.common import synthetic_resume, summarize, timed
+from skills import SkillEngine, load_taxonomy, tokenize
+
+
+def synthetic_taxonomy(size, seed=0):
+    """The real taxonomy padded with random one- and two-word skills."""
+    rng = random.Random(seed)
+    taxonomy = load_taxonomy()[:size]
+    names = {entry["name"] for entry in taxonomy}
+    while len(taxonomy) < size:
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10))) for _ in range(rng.randint(1, 2))]
+        name = " ".join(words)
+        if name not in names:
+            names.add(name)
+            taxonomy.append({"name": name})
+    return taxonomy
+
+
+def legacy_fuzzy_extract(text, skills):
+    from fuzzywuzzy import process
+    found = set()
+    for token, _, _ in tokenize(text):
+        best_match, score = process.extractOne(token, skills)
+        if score > 80:
+            found.add(best_match)
+    return list(found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="40,100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--legacy-max-size", type=int, default=1000,
+                        help="largest taxonomy to run the slow fuzzywuzzy baseline on")
+    args = parser.parse_args()
+
+    text = synthetic_resume(1, sections=10)
+    report = []
+    for size in [int(size) for size in args.sizes.split(",")]:
+        taxonomy = synthetic_taxonomy(size)
+        start = time.perf_counter()
+        engine = SkillEngine(taxonomy)
+        build_seconds = time.perf_counter() - start
+
+        row = {
+            "skills": size,
+            "build_ms": round(build_seconds * 1000, 2),
+            "exact": summarize(timed(engine.extract, text, repeat=args.repeat)),
+            "fuzzy": summarize(timed(engine.extract, text, fuzzy=True, repeat=args.repeat)),
+        }
+        if size <= args.legacy_max_size:
+            try:
+                names = [entry["name"] for entry in taxonomy]
+                row["legacy_fuzzywuzzy"] = summarize(timed(legacy_fuzzy_extract, text, names, repeat=1))
+            except ImportError:
+                pass
+        report.append(row)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
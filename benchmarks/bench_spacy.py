@@ -0,0 +1,52 @@
+"""
+Per-document spaCy parse time on the sample PDFs in uploaded_files/.
+
+Compares the full en_core_web_sm pipeline with the slim "pos" mode used by
+matcher.extract_skills, and single-document calls with bulk nlp.pipe.
+Needs the SPACY_MODEL pipeline installed (python -m spacy download en_core_web_sm).
+
+    python -m benchmarks.bench_spacy --repeat 5 --n-process 1
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import sample_pdfs, summarize, timed
+from matcher import extract_text_from_pdf
+from model_registry import get_nlp, parse, parse_many
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, default=1)
+    args = parser.parse_args()
+
+    texts = [extract_text_from_pdf(path) for path in sample_pdfs()]
+    nlp = get_nlp()
+    nlp("warm up")
+
+    report = {"documents": len(texts), "pipeline": nlp.pipe_names}
+    for mode in ["full", "pos"]:
+        latencies = []
+        for text in texts:
+            latencies += timed(parse, text, mode=mode, repeat=args.repeat)
+        report[f"{mode}_per_document"] = summarize(latencies)
+
+        # Bulk: the whole corpus through nlp.pipe, repeated
+        corpus = texts * args.repeat
+        start = time.perf_counter()
+        for _ in parse_many(corpus, mode=mode, batch_size=args.batch_size, n_process=args.n_process):
+            pass
+        elapsed = time.perf_counter() - start
+        report[f"{mode}_bulk_pipe"] = {
+            "mean_ms_per_document": round(elapsed / len(corpus) * 1000, 3),
+            "documents_per_sec": round(len(corpus) / elapsed, 2),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import os
+import random
+import statistics
+import time
+
+SAMPLE_DIR = "uploaded_files"
+
+SAMPLE_JOB_DESCRIPTION = """
+Looking for a Machine Learning Engineer with 3+ years of experience.
+Must have expertise in Python, TensorFlow, NLP, Docker and SQL.
+"""
+
+_SKILLS = [
+    "Python", "Java", "C++", "JavaScript", "React", "Node.js", "SQL", "Machine Learning",
+    "Deep Learning", "NLP", "TensorFlow", "PyTorch", "Flask", "Django", "FastAPI", "Docker",
+    "Kubernetes", "AWS", "Azure", "GCP", "Linux", "Git", "Pandas", "NumPy", "Scrum",
+]
+_FILLER = (
+    "Designed and shipped features end to end, collaborating with product and design, "
+    "improving reliability, reducing latency and mentoring junior engineers."
+)
+
+
+def synthetic_resume(seed, sections=3):
+    """Generates a deterministic, resume-shaped text; `sections` controls its length."""
+    rng = random.Random(seed)
+    lines = [
+        f"Candidate {seed}",
+        f"Email: candidate{seed}@example.com | Phone: 555-{seed:04d} | LinkedIn: linkedin.com/in/c{seed}",
+        "",
+        f"Summary: Engineer with {rng.randint(1, 15)}+ years of experience.",
+        "",
+        "Education: Bachelor of Technology, State University",
+        "",
+        "Experience:",
+    ]
+    for i in range(sections):
+        lines.append(f"• Software Engineer at Company {rng.randint(1, 500)} ({2010 + i}-{2011 + i})")
+        lines.append(f"  {_FILLER} Used {', '.join(rng.sample(_SKILLS, 4))}.")
+    lines += ["", "Skills: " + ", ".join(rng.sample(_SKILLS, 8))]
+    return "\n".join(lines)
+
+
+def write_docx(text, path):
+    import docx
+    document = docx.Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    document.save(path)
+    return path
+
+
+def sample_pdfs():
+    return sorted(
+        os.path.join(SAMPLE_DIR, name) for name in os.listdir(SAMPLE_DIR) if name.lower().endswith(".pdf")
+    )
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies, items=None):
+    """Latency percentiles (ms) and throughput for a list of per-call seconds."""
+    total = sum(latencies)
+    items = items if items is not None else len(latencies)
+    return {
+        "calls": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "items_per_sec": round(items / total, 3) if total else 0.0,
+    }
+
+
+def timed(fn, *args, repeat=5, **kwargs):
+    """Runs fn `repeat` times and returns the list of wall-clock durations."""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args, **kwargs)
+        latencies.append(time.perf_counter() - start)
+    return latencies
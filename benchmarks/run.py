@@ -0,0 +1,258 @@
+"""
+Stage-level benchmark suite for the extraction and matching pipeline.
+
+Each stage runs in a fresh process, so the reported peak RSS belongs to that
+stage alone (including the models it loads). Inputs are the PDFs in
+uploaded_files/ plus synthetic resumes of increasing length and count.
+
+    python -m benchmarks.run                          # run everything, print JSON
+    python -m benchmarks.run --stages skills          # only stages containing "skills"
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --max-regression 0.2
+
+With --compare the exit status is 1 when any stage's p50 latency grew, or
+its throughput dropped, by more than --max-regression, or when a stage timed
+in the baseline errored or did not run.
+"""
+import argparse
+import fnmatch
+import itertools
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+# Measure the work itself, not the embedding cache
+os.environ["EMBEDDING_CACHE_PATH"] = ""
+os.environ["EMBEDDING_CACHE_SIZE"] = "0"
+
+from benchmarks.common import (  # noqa: E402
+    synthetic_resume, write_docx, sample_pdfs, summarize, SAMPLE_JOB_DESCRIPTION,
+)
+
+# Synthetic resume lengths (number of experience sections)
+LENGTHS = {"short": 3, "medium": 30, "long": 300}
+# Number of job descriptions for recommend_jobs
+CATALOG_SIZES = [10, 100, 1000]
+
+
+def _clear_caches():
+    """Drops per-text caches so every call does the full work."""
+    from analysis import analyze_resume
+    analyze_resume.cache_clear()
+
+
+def _text_stage(module_name, function_name, extra_args=()):
+    """Stage factory: calls module.function(text, *extra_args) on synthetic resumes."""
+    def setup(length):
+        import importlib
+        fn = getattr(importlib.import_module(module_name), function_name)
+        texts = [synthetic_resume(seed, sections=LENGTHS[length]) for seed in range(20)]
+        return [lambda text=text: fn(text, *extra_args) for text in texts]
+    return setup
+
+
+def _pdf_stage(module_name):
+    def setup(_):
+        import importlib
+        fn = getattr(importlib.import_module(module_name), "extract_text_from_pdf")
+        return [lambda path=path: fn(path) for path in sample_pdfs()]
+    return setup
+
+
+def _docx_stage(length):
+    from matcher import extract_text_from_docx
+    tmp = tempfile.mkdtemp()
+    paths = [
+        write_docx(synthetic_resume(seed, sections=LENGTHS[length]), os.path.join(tmp, f"{seed}.docx"))
+        for seed in range(10)
+    ]
+    return [lambda path=path: extract_text_from_docx(path) for path in paths]
+
+
+def _similarity_stage(length):
+    from utils import calculate_similarity, extract_skills, extract_experience
+    calls = []
+    for seed in range(10):
+        text = synthetic_resume(seed, sections=LENGTHS[length])
+        skills, experience = extract_skills(text), extract_experience(text)
+        calls.append(lambda text=text, skills=skills, experience=experience:
+                     calculate_similarity(text, SAMPLE_JOB_DESCRIPTION, skills, experience))
+    return calls
+
+
+def _semantic_search_stage(length):
+    from utils import semantic_search
+    texts = [synthetic_resume(seed, sections=LENGTHS[length]) for seed in range(10)]
+    return [lambda text=text: semantic_search(text, SAMPLE_JOB_DESCRIPTION) for text in texts]
+
+
+def _recommend_stage(catalog_size):
+    from matcher import recommend_jobs
+    jobs = [synthetic_resume(10000 + i, sections=2) for i in range(int(catalog_size))]
+    recommend_jobs(synthetic_resume(0), jobs)  # builds the catalog once
+    texts = [synthetic_resume(seed, sections=LENGTHS["medium"]) for seed in range(10)]
+    return [lambda text=text: recommend_jobs(text, jobs) for text in texts]
+
+
+def _match_endpoint_stage(length):
+    os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_suite.db")
+    os.environ.setdefault("JOB_WORKERS", "0")
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    tmp = tempfile.mkdtemp()
+    # Every timed upload is a document never stored before, so the stored
+    # features and embeddings of earlier calls (or runs) are never reused
+    seeds = itertools.count(int(time.time() * 1000))
+    return [_FreshUpload(client, tmp, length, seeds) for _ in range(10)]
+
+
+class _FreshUpload:
+    """One /match-resume/ call; prepare() writes its next, unseen document outside the timing."""
+
+    def __init__(self, client, tmp, length, seeds):
+        self.client, self.tmp, self.length, self.seeds = client, tmp, length, seeds
+        self.path = None
+
+    def prepare(self):
+        seed = next(self.seeds)
+        self.path = write_docx(
+            synthetic_resume(seed, sections=LENGTHS[self.length]), os.path.join(self.tmp, f"{seed}.docx")
+        )
+
+    def __call__(self):
+        if self.path is None:
+            self.prepare()
+        with open(self.path, "rb") as f:
+            response = self.client.post(
+                "/match-resume/",
+                files={"file": (os.path.basename(self.path), f)},
+                data={"job_description": SAMPLE_JOB_DESCRIPTION},
+            )
+        response.raise_for_status()
+        self.path = None
+
+
+def _stages():
+    """Maps stage name -> zero-argument setup returning a list of calls to time."""
+    stages = {
+        "matcher.extract_text_from_pdf[samples]": lambda: _pdf_stage("matcher")(None),
+        "resume_parser.extract_text_from_pdf[samples]": lambda: _pdf_stage("resume_parser")(None),
+    }
+    for length in LENGTHS:
+        stages[f"matcher.extract_text_from_docx[{length}]"] = lambda length=length: _docx_stage(length)
+        for module_name, function_name in [
+            ("utils", "extract_skills"), ("matcher", "extract_skills"), ("resume_parser", "extract_skills"),
+            ("utils", "extract_experience"), ("resume_parser", "extract_experience"),
+            ("utils", "ats_screening"), ("resume_parser", "ats_screening"),
+        ]:
+            stages[f"{module_name}.{function_name}[{length}]"] = (
+                lambda m=module_name, f=function_name, length=length: _text_stage(m, f)(length)
+            )
+        stages[f"utils.calculate_similarity[{length}]"] = lambda length=length: _similarity_stage(length)
+        stages[f"utils.semantic_search[{length}]"] = lambda length=length: _semantic_search_stage(length)
+        stages[f"POST /match-resume/[{length}]"] = lambda length=length: _match_endpoint_stage(length)
+    for size in CATALOG_SIZES:
+        stages[f"matcher.recommend_jobs[{size} jobs]"] = lambda size=size: _recommend_stage(size)
+    return stages
+
+
+def run_stage(name, repeat):
+    """Runs one stage in the current process and returns its measurements."""
+    calls = _stages()[name]()
+    if not calls:
+        return {"skipped": "no inputs"}
+    calls[0]()  # warm-up: model loading is not part of the latency numbers
+
+    latencies = []
+    for _ in range(repeat):
+        for call in calls:
+            _clear_caches()
+            if hasattr(call, "prepare"):
+                call.prepare()
+            start = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - start)
+
+    result = summarize(latencies)
+    # ru_maxrss is reported in kilobytes on Linux
+    result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return result
+
+
+def select_stages(names, selection):
+    """Stage names matching `selection`: exact name, then substring, then glob."""
+    if selection in names:
+        return [selection]
+    matched = [name for name in names if selection in name]
+    if matched:
+        return matched
+    return [name for name in names if fnmatch.fnmatchcase(name, selection)]
+
+
+def compare(current, baseline, max_regression, selection="*"):
+    """
+    Returns a list of human-readable regressions.
+
+    A selected stage with baseline timings but none now (it errored, was
+    skipped or no longer exists) counts as a regression.
+    """
+    regressions = []
+    for name in select_stages(list(dict.fromkeys([*current, *baseline])), selection):
+        result, before = current.get(name, {}), baseline.get(name)
+        if not before or "p50_ms" not in before:
+            continue
+        if "p50_ms" not in result:
+            reason = result.get("error") or result.get("skipped") or "not run"
+            regressions.append(f"{name}: no timings ({reason}), baseline p50 {before['p50_ms']} ms")
+            continue
+        if before["p50_ms"] and result["p50_ms"] > before["p50_ms"] * (1 + max_regression):
+            regressions.append(f"{name}: p50 {before['p50_ms']} ms -> {result['p50_ms']} ms")
+        if before["items_per_sec"] and result["items_per_sec"] < before["items_per_sec"] * (1 - max_regression):
+            regressions.append(f"{name}: throughput {before['items_per_sec']}/s -> {result['items_per_sec']}/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", default="*", help="stage name, substring or glob of the stages to run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed slowdown, e.g. 0.2 = 20%%")
+    args = parser.parse_args()
+
+    names = select_stages(list(_stages()), args.stages)
+
+    results = {}
+    for name in names:
+        # A fresh process per stage keeps peak RSS and warm caches separate
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            try:
+                results[name] = executor.submit(run_stage, name, args.repeat).result()
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+        print(f"{name}: {json.dumps(results[name])}", file=sys.stderr)
+
+    print(json.dumps(results, indent=2))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.max_regression, args.stages)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,68 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Text
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, Text, ForeignKey, Index, LargeBinary, DateTime
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy import Boolean
 import os
 import json  # Import JSON for handling lists
+from datetime import datetime, timezone
 from passlib.context import CryptContext
 
 # Database Configuration
 DATABASE_URL = os.environ.get("DATABASE_URL") or "sqlite:///./resume_matcher.db"
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# SQLite: WAL lets readers run alongside the single writer; synchronous=NORMAL
+# only syncs at checkpoints, which is still crash-safe in WAL mode
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE_MB = int(os.environ.get("SQLITE_MMAP_SIZE_MB", "256"))
+# How long a writer waits for the lock before failing with "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "30000"))
+
+# Connection pool (any backend); size it to the threads that use the database at once
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", str(min(32, (os.cpu_count() or 1) + 4))))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+
+
+def _engine_options(url):
+    if url.startswith("sqlite"):
+        if ":memory:" in url or url.rstrip("/") == "sqlite:":
+            return {}  # SQLAlchemy's single-connection pool for in-memory databases
+        return {
+            "connect_args": {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+        }
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+# Committed rows keep their loaded values, so reading an id or score after
+# commit() does not cost another SELECT
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
@@ -28,31 +80,114 @@ class Resume(Base):
     __tablename__ = "resumes"
 
     id = Column(Integer, primary_key=True, index=True)
-    filename = Column(String)
+    filename = Column(String, index=True)
     skills = Column(Text)  # Store skills as JSON text
-    experience_years = Column(Float)
-    match_score = Column(Float)
+    experience_years = Column(Float, index=True)
+    match_score = Column(Float, index=True)
     job_ranking = Column(Float)
     ats_score = Column(Float)
     ats_feedback = Column(String)
     job_description = Column(Text)
+    content_hash = Column(String(64), index=True)  # SHA-256 of the uploaded file, see ResumeFeatures
+    job_id = Column(String(32), unique=True, index=True)  # background job that stored the row, see job_queue
+    created_at = Column(DateTime, index=True, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))  # UTC
 
-    # Convert skills list to JSON before storing
+    # One row per skill, for indexed filtering
+    skill_rows = relationship("ResumeSkill", cascade="all, delete-orphan")
+
+    # Convert skills list to JSON before storing, and keep resume_skills in sync
     def set_skills(self, skills_list):
         self.skills = json.dumps(skills_list)
+        self.skill_rows = [ResumeSkill(skill=skill) for skill in dict.fromkeys(skills_list)]
 
     # Convert JSON string back to list when retrieving
     def get_skills(self):
         return json.loads(self.skills) if self.skills else []
 
+# Resume <-> skill association
+class ResumeSkill(Base):
+    __tablename__ = "resume_skills"
+
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True)
+    skill = Column(String, primary_key=True)
+
+    __table_args__ = (Index("ix_resume_skills_skill_resume_id", "skill", "resume_id"),)
+
 # Feedback Model
 class Feedback(Base):
     __tablename__ = "feedback"
 
     id = Column(Integer, primary_key=True, index=True)
-    filename = Column(String)
+    resume_id = Column(Integer, ForeignKey("resumes.id"), index=True)
+    filename = Column(String, index=True)
     rating = Column(Float)
     comments = Column(String)
 
-# Create Tables
+# Job-independent features of an uploaded file, keyed by the SHA-256 of its bytes (see feature_store.py)
+class ResumeFeatures(Base):
+    __tablename__ = "resume_features"
+
+    content_hash = Column(String(64), primary_key=True)
+    text = Column(LargeBinary)  # zlib-compressed UTF-8
+    skills = Column(Text)  # JSON list
+    experience_years = Column(Float)
+    ats_score = Column(Float)
+    ats_feedback = Column(String)
+    embedding = Column(LargeBinary)  # float32 vector
+    embedding_model = Column(String)  # model (and profile) that produced `embedding`
+    term_counts = Column(LargeBinary)  # zlib-compressed JSON {term: count} for tfidf_model
+
+# Corpus of the shared TF-IDF model: one row per counted document, and the
+# document frequency of every term seen so far (see tfidf_model.py)
+class TfidfDocument(Base):
+    __tablename__ = "tfidf_documents"
+
+    doc_hash = Column(String(64), primary_key=True)
+
+class TfidfTerm(Base):
+    __tablename__ = "tfidf_terms"
+
+    term = Column(String, primary_key=True)
+    df = Column(Integer, nullable=False, default=0)
+
+# Running aggregates maintained alongside inserts (see stats.py)
+class StatCounter(Base):
+    __tablename__ = "stat_counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(Float, nullable=False, default=0.0)
+
+class SkillCount(Base):
+    __tablename__ = "skill_counts"
+
+    skill = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0, index=True)
+
+# One-off data backfills that have already run (see migrations.py)
+class AppliedMigration(Base):
+    __tablename__ = "applied_migrations"
+
+    name = Column(String, primary_key=True)
+
+def dialect_insert(db):
+    """INSERT construct of the session's dialect, for ON CONFLICT upserts."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Upserts are not supported on {dialect}")
+
+def add_counts(db, model, key_column, value_column, deltas):
+    """Adds each delta to its row, creating missing rows (one upsert per batch)."""
+    if not deltas:
+        return
+    stmt = dialect_insert(db)(model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[key_column],
+        set_={value_column: getattr(model, value_column) + getattr(stmt.excluded, value_column)},
+    )
+    db.execute(stmt, [{key_column: key, value_column: delta} for key, delta in deltas.items()])
+
+# Create Tables (existing databases are upgraded by migrations.migrate)
 Base.metadata.create_all(bind=engine)
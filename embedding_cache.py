@@ -0,0 +1,149 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+from model_registry import get_bert_model, EMBEDDING_MODEL, EMBEDDING_PROFILE
+from metrics import stage
+
+# Persistent tier lives next to resume_matcher.db by default
+EMBEDDING_CACHE_PATH = os.environ.get("EMBEDDING_CACHE_PATH", "./embedding_cache.db")
+EMBEDDING_CACHE_SIZE = int(os.environ.get("EMBEDDING_CACHE_SIZE", "2048"))
+# Cache misses are encoded in chunks of this many texts, longest first
+ENCODE_CHUNK_SIZE = int(os.environ.get("ENCODE_CHUNK_SIZE", "512"))
+
+
+def normalize_text(text):
+    """Collapses whitespace so trivially different copies share a cache entry."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed cache of float32 embeddings.
+
+    Entries are keyed by a SHA-256 of the model name, the inference profile
+    and the normalized text.
+    Lookups go through a bounded in-memory LRU first and fall back to an
+    SQLite blob table; only texts missing from both are sent to the model.
+    """
+
+    def __init__(self, model_name=EMBEDDING_MODEL, path=EMBEDDING_CACHE_PATH, max_entries=EMBEDDING_CACHE_SIZE,
+                 profile=EMBEDDING_PROFILE):
+        # fp32 keys keep the bare model name so existing cache entries stay valid
+        self.model_name = model_name if profile == "fp32" else f"{model_name}:{profile}"
+        self.max_entries = max_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._conn.commit()
+
+    def key(self, text):
+        payload = f"{self.model_name}\0{normalize_text(text)}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Returns the cached vector for `key`, or None."""
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector
+            if self._conn is not None:
+                row = self._conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    vector = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(key, vector)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return vector
+            self.misses += 1
+            return None
+
+    def put_many(self, items):
+        """Stores (key, vector) pairs in both tiers."""
+        with self._lock:
+            for key, vector in items:
+                self._remember(key, vector)
+            if self._conn is not None:
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                        [(key, vector.tobytes()) for key, vector in items],
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logging.warning(f"Embedding cache write failed: {e}")
+
+    def encode(self, texts, batch_size=32):
+        """
+        Returns a (len(texts), dim) float32 matrix, encoding only cache misses.
+        """
+        keys = [self.key(text) for text in texts]
+        vectors = [self.get(key) for key in keys]
+
+        # Encode each distinct missing text once, in a single model call
+        missing = OrderedDict()
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(keys[i], texts[i])
+        if missing:
+            fresh = {}
+            # Longest first, so every chunk (and every batch inside it) holds
+            # texts of similar length and pads little
+            pending = sorted(missing.items(), key=lambda item: len(item[1]), reverse=True)
+            for start in range(0, len(pending), ENCODE_CHUNK_SIZE):
+                chunk = pending[start:start + ENCODE_CHUNK_SIZE]
+                with stage("embedding"):
+                    encoded = get_bert_model().encode([text for _, text in chunk], batch_size=batch_size)
+                encoded = np.asarray(encoded, dtype=np.float32)
+                items = [(key, vector) for (key, _), vector in zip(chunk, encoded)]
+                self.put_many(items)
+                fresh.update(items)
+            vectors = [fresh[keys[i]] if vector is None else vector for i, vector in enumerate(vectors)]
+
+        return np.vstack(vectors)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache():
+    """Returns the process-wide embedding cache."""
+    return EmbeddingCache()
+
+
+def encode_texts(texts, batch_size=32):
+    """Encodes texts through the shared embedding cache."""
+    return get_embedding_cache().encode(list(texts), batch_size=batch_size)
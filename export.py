@@ -0,0 +1,110 @@
+"""
+Streaming exports of stored resumes and feedback as CSV or NDJSON.
+
+Rows are read through a server-side cursor (yield_per / stream_results) and
+encoded a chunk at a time, so memory stays flat however large the tables
+are. Rows come out in id order; to resume an interrupted export, pass the
+last id received as `after_id`.
+"""
+import csv
+import io
+import json
+from datetime import timezone
+
+from sqlalchemy import select
+
+from database import SessionLocal, Resume, ResumeSkill, Feedback
+
+# Rows fetched from the cursor and encoded per chunk
+EXPORT_CHUNK_ROWS = 1000
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+RESUME_COLUMNS = [
+    Resume.id, Resume.filename, Resume.created_at, Resume.match_score, Resume.job_ranking,
+    Resume.experience_years, Resume.ats_score, Resume.skills, Resume.content_hash,
+]
+FEEDBACK_COLUMNS = [Feedback.id, Feedback.resume_id, Feedback.filename, Feedback.rating, Feedback.comments]
+
+
+def _utc(value):
+    """Naive UTC datetime, as stored in Resume.created_at."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def resume_query(skills=None, min_score=None, max_score=None, created_after=None, created_before=None, after_id=None):
+    """SELECT of the exported resume columns with the given filters, in id order."""
+    query = select(*RESUME_COLUMNS)
+    for name in skills or []:
+        query = query.where(Resume.id.in_(select(ResumeSkill.resume_id).where(ResumeSkill.skill == name.lower())))
+    if min_score is not None:
+        query = query.where(Resume.match_score >= min_score)
+    if max_score is not None:
+        query = query.where(Resume.match_score <= max_score)
+    if created_after is not None:
+        query = query.where(Resume.created_at >= _utc(created_after))
+    if created_before is not None:
+        query = query.where(Resume.created_at < _utc(created_before))
+    if after_id is not None:
+        query = query.where(Resume.id > after_id)
+    return query.order_by(Resume.id)
+
+
+def feedback_query(resume_id=None, after_id=None):
+    query = select(*FEEDBACK_COLUMNS)
+    if resume_id is not None:
+        query = query.where(Feedback.resume_id == resume_id)
+    if after_id is not None:
+        query = query.where(Feedback.id > after_id)
+    return query.order_by(Feedback.id)
+
+
+def _record(row):
+    record = dict(row._mapping)
+    if "skills" in record:
+        record["skills"] = json.loads(record["skills"]) if record["skills"] else []
+    if record.get("created_at") is not None:
+        record["created_at"] = record["created_at"].isoformat()
+    return record
+
+
+def _encode_csv(records, header):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header is not None:
+        writer.writerow(header)
+    for record in records:
+        writer.writerow(
+            ";".join(value) if isinstance(value, list) else value
+            for value in record.values()
+        )
+    return buffer.getvalue()
+
+
+def _encode_ndjson(records):
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+
+def stream_rows(query, fmt, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Yields the query's rows encoded as `fmt`, one chunk of rows per string.
+
+    Opens its own session, because the generator outlives the request
+    handler; CSV skills are joined with ';'.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(yield_per=chunk_rows, stream_results=True))
+        header = list(result.keys()) if fmt == "csv" else None
+        if header is not None:
+            yield _encode_csv([], header)
+        for rows in result.partitions():
+            records = [_record(row) for row in rows]
+            yield _encode_csv(records, None) if fmt == "csv" else _encode_ndjson(records)
+    finally:
+        db.close()
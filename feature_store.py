@@ -0,0 +1,96 @@
+"""
+Persistent store of the job-independent features of uploaded resumes.
+
+Rows are keyed by the SHA-256 of the uploaded bytes (the same hash that
+names the file in uploaded_files/), so identical uploads share one entry.
+Each row holds the zlib-compressed extracted text and term counts, the
+skills, experience, ATS result and the resume embedding, which is enough to
+score the resume against any job description without touching the file again.
+"""
+import json
+import zlib
+
+import numpy as np
+
+from database import Resume, ResumeFeatures, dialect_insert
+from embedding_cache import get_embedding_cache
+import tfidf_model
+
+# Resumes loaded per query when iterating over stored features
+FEATURE_CHUNK_ROWS = 1000
+
+
+def _embedding_model():
+    # Same model/profile key as the embedding cache, so stale vectors are detected
+    return get_embedding_cache().model_name
+
+
+def _to_features(row):
+    """Converts a ResumeFeatures row to the feature dict used by ScoringPipeline."""
+    embedding = None
+    if row.embedding is not None and row.embedding_model == _embedding_model():
+        embedding = np.frombuffer(row.embedding, dtype=np.float32)
+    return {
+        "text": zlib.decompress(row.text).decode("utf-8"),
+        "skills": json.loads(row.skills) if row.skills else [],
+        "experience_years": row.experience_years,
+        "ats_score": row.ats_score,
+        "ats_feedback": row.ats_feedback,
+        "embedding": embedding,  # None when missing or produced by another model
+        "term_counts": tfidf_model.unpack_counts(row.term_counts) if row.term_counts is not None else None,
+    }
+
+
+def get_features(db, content_hash):
+    """Returns the stored features for a file hash, or None."""
+    row = db.get(ResumeFeatures, content_hash)
+    return _to_features(row) if row is not None else None
+
+
+def save_features(db, content_hash, features, embedding):
+    """
+    Stores (or replaces) the features of a file and adds the resume to the
+    TF-IDF corpus; call before the commit.
+    """
+    values = {
+        "content_hash": content_hash,
+        "text": zlib.compress(features["text"].encode("utf-8")),
+        "skills": json.dumps(features["skills"]),
+        "experience_years": features["experience_years"],
+        "ats_score": features["ats_score"],
+        "ats_feedback": features["ats_feedback"],
+        "embedding": np.asarray(embedding, dtype=np.float32).tobytes(),
+        "embedding_model": _embedding_model(),
+        "term_counts": tfidf_model.pack_counts(features["term_counts"]),
+    }
+    stmt = dialect_insert(db)(ResumeFeatures).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["content_hash"],
+        set_={key: value for key, value in values.items() if key != "content_hash"},
+    )
+    db.execute(stmt)
+    tfidf_model.record_documents(db, {content_hash: features["term_counts"]})
+
+
+def iter_resume_features(db, resume_ids=None, chunk_rows=FEATURE_CHUNK_ROWS, after_id=0):
+    """
+    Yields lists of (resume_id, filename, features) in id order.
+
+    Only resumes with stored features are returned; pass `resume_ids` to
+    restrict the scan, or None for every resume. Resumes with ids up to
+    `after_id` are skipped.
+    """
+    last_id = after_id
+    while True:
+        query = (
+            db.query(Resume.id, Resume.filename, ResumeFeatures)
+            .join(ResumeFeatures, ResumeFeatures.content_hash == Resume.content_hash)
+            .filter(Resume.id > last_id)
+        )
+        if resume_ids is not None:
+            query = query.filter(Resume.id.in_(resume_ids))
+        rows = query.order_by(Resume.id).limit(chunk_rows).all()
+        if not rows:
+            return
+        yield [(resume_id, filename, _to_features(row)) for resume_id, filename, row in rows]
+        last_id = rows[-1][0]
@@ -0,0 +1,236 @@
+"""
+Bulk ingestion of a directory of PDF/DOCX resumes.
+
+Files are extracted and featurized on a pool of worker processes, each of
+which loads the models once. Results are written in one transaction per
+batch: Resume rows, stored features, dashboard stats, the TF-IDF corpus and
+the vector index. Every committed file is appended to a checkpoint file, so
+running the same command again skips what is already done. Files that cannot
+be extracted are logged and checkpointed too, so they are not retried. A
+batch that fails as a whole (a crashed worker, a failed commit) is logged
+but not checkpointed, so the next run retries it; the run continues.
+
+    python ingest.py /data/resumes --job-description-file jd.txt --workers 4
+
+Without a job description the resumes are stored with their features but
+no match score; score them later with /rescore or /screen.
+
+A crash between a batch's commit and its checkpoint write re-ingests that
+one batch on the next run.
+"""
+import argparse
+import hashlib
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from database import SessionLocal
+from migrations import migrate
+from pipeline import ScoringPipeline, extract_resume_text, store_scored
+from matcher import extract_skills_bulk, NO_TEXT_FOUND
+from embedding_cache import encode_texts
+from uploads import content_path, CHUNK_SIZE
+from vector_index import get_vector_index
+from workers import configure_torch_threads
+from model_registry import warm_up
+import feature_store
+
+SUPPORTED_EXTENSIONS = ("pdf", "docx")
+
+
+def find_resumes(root):
+    """All PDF/DOCX files under `root`, in a stable order."""
+    paths = []
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if name.rsplit(".", 1)[-1].lower() in SUPPORTED_EXTENSIONS:
+                paths.append(os.path.join(directory, name))
+    return sorted(paths)
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def store_file(path, file_ext):
+    """Copies a file into the content-addressed upload store; returns (sha256, stored_path)."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            hasher.update(chunk)
+    content_hash = hasher.hexdigest()
+    stored_path = content_path(content_hash, file_ext)
+    if not os.path.exists(stored_path):
+        os.makedirs(os.path.dirname(stored_path), exist_ok=True)
+        # A unique temp name, so concurrent workers copying the same content do not collide
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(stored_path), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as dst, open(path, "rb") as src:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            os.replace(tmp_path, stored_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return content_hash, stored_path
+
+
+def _init_worker():
+    """Runs once per worker process: tunes torch and loads the models."""
+    configure_torch_threads()
+    warm_up()
+
+
+def process_batch(paths, job_description):
+    """
+    Extracts and featurizes a batch of files inside a worker process.
+
+    Returns (processed, failures): processed holds (path, content_hash,
+    result, embedding, fresh_features) and failures holds (path, error).
+    """
+    loaded, failures = [], []
+    db = SessionLocal()
+    try:
+        for path in paths:
+            try:
+                file_ext = path.rsplit(".", 1)[-1].lower()
+                content_hash, stored_path = store_file(path, file_ext)
+                features = feature_store.get_features(db, content_hash)
+                text = features["text"] if features is not None else extract_resume_text(stored_path, file_ext)
+                if not text.strip() or text == NO_TEXT_FOUND:
+                    failures.append((path, "No text extracted"))
+                    continue
+                loaded.append((path, content_hash, text, features))
+            except Exception as e:
+                failures.append((path, f"{type(e).__name__}: {e}"))
+    finally:
+        db.close()
+    if not loaded:
+        return [], failures
+
+    # One encode and one spaCy pass for the files without stored features
+    needs_encode = [features is None or features["embedding"] is None for _, _, _, features in loaded]
+    to_encode = [text for (_, _, text, _), needed in zip(loaded, needs_encode) if needed]
+    encoded = iter(encode_texts(to_encode + ([job_description] if job_description else [])))
+    fresh_texts = [text for _, _, text, features in loaded if features is None]
+    fresh_skills = iter(extract_skills_bulk(fresh_texts) if fresh_texts else [])
+    embeddings = [
+        next(encoded) if needed else features["embedding"]
+        for (_, _, _, features), needed in zip(loaded, needs_encode)
+    ]
+    jd_embedding = next(encoded) if job_description else None
+
+    processed = []
+    for (path, content_hash, text, features), embedding in zip(loaded, embeddings):
+        pipeline = ScoringPipeline(
+            text, job_description or "",
+            embeddings=(embedding, jd_embedding) if job_description else None,
+            features=features,
+            skills=next(fresh_skills) if features is None else None,
+        )
+        if job_description:
+            result = pipeline.result()
+        else:
+            ats_score, ats_feedback = pipeline.ats
+            result = {
+                "skills": pipeline.skills,
+                "experience_years": float(pipeline.experience_years),
+                "match_score": None,
+                "job_ranking": None,
+                "ats_score": ats_score,
+                "ats_feedback": ats_feedback,
+            }
+        processed.append((path, content_hash, result, embedding, pipeline.features() if features is None else None))
+    return processed, failures
+
+
+def write_batch(processed, job_description):
+    """Stores one batch in a single transaction; returns the new resume ids."""
+    db = SessionLocal()
+    try:
+        resumes = store_scored(db, [
+            (os.path.basename(path), content_hash, result, embedding, fresh_features, job_description)
+            for path, content_hash, result, embedding, fresh_features in processed
+        ])
+        db.commit()
+        get_vector_index().add([r.id for r in resumes], [embedding for _, _, _, embedding, _ in processed])
+        return [r.id for r in resumes]
+    finally:
+        db.close()
+
+
+def ingest(root, job_description=None, workers=2, batch_size=32, checkpoint_path="ingest.checkpoint",
+           failures_path="ingest_failures.log"):
+    migrate()
+    done = load_checkpoint(checkpoint_path)
+    pending = [path for path in find_resumes(root) if path not in done]
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    logging.info(f"{len(done)} files already ingested, {len(pending)} to go")
+    if not pending:
+        return
+
+    # Split the cores between workers unless TORCH_THREADS was set explicitly
+    os.environ.setdefault("TORCH_THREADS", str(max(1, (os.cpu_count() or 1) // workers)))
+
+    ingested = failed = 0
+    start = time.monotonic()
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers, initializer=_init_worker) as pool, \
+            open(checkpoint_path, "a") as checkpoint, open(failures_path, "a") as failures_log:
+        tasks = [(batch, pool.apply_async(process_batch, (batch, job_description))) for batch in batches]
+        for batch, task in tasks:
+            try:
+                processed, failures = task.get()
+                if processed:
+                    write_batch(processed, job_description)
+            except Exception as e:
+                # Nothing in the batch was stored; log it without checkpointing so the next run retries it
+                logging.exception(f"Batch of {len(batch)} files failed")
+                failures_log.writelines(f"{path}\tbatch failed: {type(e).__name__}: {e}\n" for path in batch)
+                failures_log.flush()
+                failed += len(batch)
+            else:
+                for path, error in failures:
+                    failures_log.write(f"{path}\t{error}\n")
+                failures_log.flush()
+                checkpoint.writelines(f"{path}\n" for path, *_ in processed)
+                checkpoint.writelines(f"{path}\n" for path, _ in failures)
+                checkpoint.flush()
+                os.fsync(checkpoint.fileno())
+                ingested += len(processed)
+                failed += len(failures)
+
+            elapsed = time.monotonic() - start
+            print(
+                f"\r{ingested + failed}/{len(pending)} files, {ingested / elapsed:.1f} files/s, {failed} failed",
+                end="", file=sys.stderr, flush=True,
+            )
+    print(file=sys.stderr)
+    logging.info(f"Ingested {ingested} files, {failed} failed (see {failures_path})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-ingest a directory of PDF/DOCX resumes")
+    parser.add_argument("directory")
+    jd_group = parser.add_mutually_exclusive_group()
+    jd_group.add_argument("--job-description", help="score every resume against this job description")
+    jd_group.add_argument("--job-description-file", help="read the job description from a file")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 2))
+    parser.add_argument("--batch-size", type=int, default=32, help="files per worker task and per transaction")
+    parser.add_argument("--checkpoint", default="ingest.checkpoint")
+    parser.add_argument("--failures", default="ingest_failures.log")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    job_description = args.job_description
+    if args.job_description_file:
+        with open(args.job_description_file) as f:
+            job_description = f.read()
+    ingest(args.directory, job_description, args.workers, args.batch_size, args.checkpoint, args.failures)
@@ -0,0 +1,289 @@
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+
+from sqlalchemy.exc import IntegrityError
+
+from pipeline import ScoringPipeline, extract_resume_text, stored_embeddings, store_scored
+from matcher import extract_skills
+from database import SessionLocal, Resume
+from uploads import content_hash_of
+import feature_store
+from vector_index import get_vector_index
+from model_registry import warm_up
+from workers import configure_torch_threads
+
+JOB_QUEUE_PATH = os.environ.get("JOB_QUEUE_PATH", "./job_queue.db")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+# A running job whose lease has not been renewed for this long is requeued
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "600"))
+# Workers renew the lease of the job they are running this often
+JOB_HEARTBEAT_SECONDS = float(os.environ.get("JOB_HEARTBEAT_SECONDS", str(JOB_LEASE_SECONDS / 3)))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+POLL_INTERVAL_SECONDS = 0.5
+
+# Progress stages reported by workers, in order
+STAGES = ["queued", "extracted", "skills", "scored", "stored"]
+
+_JOB_FIELDS = [
+    "id", "status", "stage", "filename", "file_path", "file_ext", "job_description",
+    "result", "error", "attempts", "created_at", "updated_at", "owner", "lease_until",
+]
+
+
+def _connect():
+    conn = sqlite3.connect(JOB_QUEUE_PATH, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def init_queue():
+    with closing(_connect()) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                file_ext TEXT NOT NULL,
+                job_description TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                owner TEXT,
+                lease_until REAL
+            )
+        """)
+        # Queues created before leases had owners
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in (("owner", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status_created ON jobs (status, created_at)")
+
+
+def enqueue(filename, file_path, file_ext, job_description):
+    """Adds a resume to the queue and returns its job id."""
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    with closing(_connect()) as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, status, stage, filename, file_path, file_ext, job_description, created_at, updated_at) "
+            "VALUES (?, 'queued', 'queued', ?, ?, ?, ?, ?, ?)",
+            (job_id, filename, file_path, file_ext, job_description, now, now),
+        )
+    return job_id
+
+
+def get_job(job_id):
+    """Returns the job as a dict, or None if it does not exist."""
+    with closing(_connect()) as conn:
+        row = conn.execute(f"SELECT {', '.join(_JOB_FIELDS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = dict(zip(_JOB_FIELDS, row))
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def queue_depth():
+    """Number of jobs waiting to be picked up."""
+    with closing(_connect()) as conn:
+        return conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+
+def claim_next():
+    """
+    Atomically moves the oldest runnable job to 'running' and returns it.
+
+    The claim is a lease: the job carries a fresh `owner` token and a
+    `lease_until` deadline that the worker extends with renew_lease. Jobs
+    whose lease expired (a crashed, restarted or stuck worker) become
+    runnable again, so unfinished work resumes after a restart.
+    """
+    now = time.time()
+    owner = uuid.uuid4().hex
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Too many attempts', owner = NULL, updated_at = ? "
+            "WHERE status = 'running' AND COALESCE(lease_until, 0) < ? AND attempts >= ?",
+            (now, now, JOB_MAX_ATTEMPTS),
+        )
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE status = 'queued' OR (status = 'running' AND COALESCE(lease_until, 0) < ?) "
+            "ORDER BY created_at LIMIT 1",
+            (now,),
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, owner = ?, lease_until = ?, updated_at = ? "
+            "WHERE id = ?",
+            (owner, now + JOB_LEASE_SECONDS, now, row[0]),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return get_job(row[0])
+
+
+def _update(job, **fields):
+    """Updates a running job if `job` still holds its lease; returns whether it did."""
+    fields["updated_at"] = time.time()
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    with closing(_connect()) as conn:
+        cursor = conn.execute(
+            f"UPDATE jobs SET {assignments} WHERE id = ? AND owner = ? AND status = 'running'",
+            (*fields.values(), job["id"], job["owner"]),
+        )
+        return cursor.rowcount > 0
+
+
+def renew_lease(job):
+    return _update(job, lease_until=time.time() + JOB_LEASE_SECONDS)
+
+
+def report_stage(job, stage):
+    _update(job, stage=stage)
+
+
+def complete(job, result):
+    return _update(job, status="done", stage="stored", result=json.dumps(result), owner=None, lease_until=None)
+
+
+def fail(job, error):
+    return _update(job, status="failed", error=error, owner=None, lease_until=None)
+
+
+def _stored_result(resume):
+    return {
+        "id": resume.id,
+        "filename": resume.filename,
+        "skills": resume.get_skills(),
+        "experience_years": resume.experience_years,
+        "match_score": resume.match_score,
+        "job_ranking": resume.job_ranking,
+        "ats_score": resume.ats_score,
+        "ats_feedback": resume.ats_feedback,
+        "job_description": resume.job_description,
+    }
+
+
+def process_job(job):
+    """
+    Runs extraction, scoring and storage for one job, reporting each stage.
+
+    Storing is idempotent per job id: a retry after a crash, or a worker
+    that lost its lease, returns the Resume row already stored for the job.
+    """
+    content_hash = content_hash_of(job["file_path"])
+    db = SessionLocal()
+    try:
+        stored = db.query(Resume).filter(Resume.job_id == job["id"]).first()
+        if stored is not None:
+            return _stored_result(stored)
+
+        features = feature_store.get_features(db, content_hash)
+        resume_text = features["text"] if features is not None else extract_resume_text(job["file_path"], job["file_ext"])
+        if not resume_text.strip():
+            raise ValueError("Failed to extract text from resume")
+        report_stage(job, "extracted")
+
+        skills = extract_skills(resume_text) if features is None else None
+        report_stage(job, "skills")
+
+        embeddings = stored_embeddings(features, job["job_description"])
+        pipeline = ScoringPipeline(
+            resume_text, job["job_description"], embeddings=embeddings, features=features, skills=skills
+        )
+        result = pipeline.result()
+        report_stage(job, "scored")
+
+        fresh_features = pipeline.features() if features is None else None
+        resume, = store_scored(db, [
+            (job["filename"], content_hash, result, pipeline.embeddings[0], fresh_features, job["job_description"])
+        ])
+        resume.job_id = job["id"]
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker stored this job first
+            db.rollback()
+            return _stored_result(db.query(Resume).filter(Resume.job_id == job["id"]).one())
+        get_vector_index().add([resume.id], [pipeline.embeddings[0]])
+        return {"id": resume.id, "filename": job["filename"], **result, "job_description": job["job_description"]}
+    finally:
+        db.close()
+
+
+def _heartbeat(job, stop):
+    """Extends the job's lease until `stop` is set or the lease is lost."""
+    while not stop.wait(JOB_HEARTBEAT_SECONDS):
+        if not renew_lease(job):
+            return
+
+
+def worker_loop(stop_event):
+    """Entry point of a queue worker process."""
+    configure_torch_threads()
+    warm_up()
+    while not stop_event.is_set():
+        job = claim_next()
+        if job is None:
+            stop_event.wait(POLL_INTERVAL_SECONDS)
+            continue
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=_heartbeat, args=(job, stop_heartbeat), daemon=True)
+        heartbeat.start()
+        try:
+            done = complete(job, process_job(job))
+        except Exception as e:
+            logging.error(f"Job {job['id']} failed: {e}")
+            done = fail(job, str(e))
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+        if not done:
+            logging.warning(f"Job {job['id']} lost its lease; its status was left to the new owner")
+
+
+_processes = []
+_stop_event = None
+
+
+def start_workers(count=JOB_WORKERS):
+    """Starts `count` queue worker processes."""
+    global _stop_event
+    if _processes or count <= 0:
+        return
+    context = multiprocessing.get_context("spawn")
+    _stop_event = context.Event()
+    for _ in range(count):
+        process = context.Process(target=worker_loop, args=(_stop_event,), daemon=True)
+        process.start()
+        _processes.append(process)
+
+
+def stop_workers(timeout=10):
+    if _stop_event is not None:
+        _stop_event.set()
+    for process in _processes:
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+    _processes.clear()
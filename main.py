@@ -1,25 +1,127 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
+from contextlib import asynccontextmanager
 from sqlalchemy.orm import Session
+from sqlalchemy import select, or_, and_
 from typing import List, Dict, Any
+from datetime import datetime
+import asyncio
 import json
+import logging
 import os
+import time
 import pdfplumber
-from collections import Counter
 import uvicorn
 
-from matcher import extract_text_from_pdf, extract_text_from_docx, extract_skills
-from utils import calculate_similarity, extract_experience, ats_screening, semantic_search
-from database import SessionLocal, engine, Base, Resume, Feedback
+from pipeline import score_resume_file, score_resume_batch, store_scored, rescore_features, search_similar
+from embedding_cache import get_embedding_cache
+from vector_index import get_vector_index
+from database import SessionLocal, engine, Resume, ResumeSkill, Feedback
+from migrations import migrate
+import stats
+from model_registry import warm_up, is_ready, preload_for_fork, PRELOAD_MODELS
+from workers import get_worker_pool, shutdown_worker_pool, PoolSaturated
+from uploads import save_upload, UploadTooLarge, UPLOAD_DIR
+import job_queue
+import feature_store
+from retrieval import get_candidate_index, RETRIEVAL_CANDIDATES
+import metrics
+from metrics import stage
+import export
+import write_behind
 
-# Initialize Database
-Base.metadata.create_all(bind=engine)
+# Initialize Database (creates tables and upgrades older schemas)
+migrate(engine)
+metrics.instrument_engine(engine)
 
-app = FastAPI()
+# Load models before gunicorn forks its workers (used with --preload)
+if PRELOAD_MODELS:
+    preload_for_fork()
+
+# Set when the background model warm-up fails; reported by /ready
+_warm_up_error = None
+
+def _on_warm_up_done(task):
+    global _warm_up_error
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        _warm_up_error = f"{type(error).__name__}: {error}"
+        logging.error("Model warm-up failed", exc_info=error)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm models in the background so the server can answer liveness checks;
+    # /ready reports 503 until the warm-up has finished.
+    warm_up_task = asyncio.create_task(asyncio.to_thread(warm_up))
+    warm_up_task.add_done_callback(_on_warm_up_done)
+    get_worker_pool()
+    job_queue.init_queue()
+    job_queue.start_workers()
+    yield
+    if not warm_up_task.done():
+        warm_up_task.cancel()
+    shutdown_worker_pool()
+    write_behind.shutdown_committer()
+    job_queue.stop_workers()
+
+app = FastAPI(lifespan=lifespan)
+
+@app.exception_handler(UploadTooLarge)
+async def upload_too_large_handler(request: Request, exc: UploadTooLarge):
+    return JSONResponse(status_code=413, content={"detail": str(exc)})
+
+@app.exception_handler(PoolSaturated)
+async def pool_saturated_handler(request: Request, exc: PoolSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry later"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+@app.middleware("http")
+async def record_request_timing(request: Request, call_next):
+    token = metrics.start_request() if metrics.SERVER_TIMING else None
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    metrics.REQUEST_SECONDS.observe(
+        time.perf_counter() - start,
+        method=request.method, route=route.path if route else "unmatched", status=str(response.status_code),
+    )
+    if token is not None:
+        response.headers["Server-Timing"] = metrics.finish_request(token)
+    return response
+
+def _cache_lookups():
+    cache_stats = get_embedding_cache().stats()
+    return {("memory",): cache_stats["hits"] - cache_stats["disk_hits"], ("disk",): cache_stats["disk_hits"], ("miss",): cache_stats["misses"]}
+
+def _queue_depth():
+    pool = get_worker_pool()
+    depth = {("worker_pool",): pool.pending, ("job_queue",): job_queue.queue_depth()}
+    if write_behind.WRITE_BEHIND:
+        # Read the committer without starting it; a scrape is not a first use
+        committer = write_behind._committer
+        depth[("write_behind",)] = committer.pending if committer is not None else 0
+    return depth
+
+metrics.Counter(
+    "resume_matcher_embedding_cache_lookups_total", "Embedding cache lookups by result.", ["result"], callback=_cache_lookups
+)
+metrics.Gauge(
+    "resume_matcher_queue_depth",
+    "Tasks waiting or running in the worker pool, queued background jobs and results waiting for a grouped commit.",
+    ["queue"], callback=_queue_depth,
+)
 
-UPLOAD_DIR = "uploaded_files"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Default number of texts per SentenceTransformer forward pass
+ENCODE_BATCH_SIZE = int(os.environ.get("ENCODE_BATCH_SIZE", "32"))
+
 # Allow only specific frontend origins
 origins = ["http://localhost:3000", "https://yourfrontend.com"]  # Update frontend URL
 
@@ -39,6 +141,22 @@ def get_db():
     finally:
         db.close()
 
+@app.get("/ready")
+async def readiness():
+    if _warm_up_error is not None:
+        return JSONResponse(status_code=503, content={"status": "failed", "error": _warm_up_error})
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"status": "loading"})
+    return {"status": "ready"}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(await asyncio.to_thread(metrics.render), media_type="text/plain; version=0.0.4")
+
+@app.get("/embedding-cache/stats")
+async def embedding_cache_stats():
+    return get_embedding_cache().stats()
+
 @app.post("/match-resume/")
 async def match_resume(
     file: UploadFile = File(...),
@@ -49,92 +167,403 @@ async def match_resume(
     if file_ext not in ["pdf", "docx"]:
         raise HTTPException(status_code=400, detail="Unsupported file format")
 
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
+    with stage("upload"):
+        content_hash, file_path = await save_upload(file, file_ext)
+    features = feature_store.get_features(db, content_hash)
 
-    resume_text = extract_text_from_pdf(file_path) if file_ext == "pdf" else extract_text_from_docx(file_path)
-    if not resume_text.strip():
+    # Extraction and scoring run in the worker pool, off the event loop
+    result, embedding, fresh_features = await get_worker_pool().run(
+        score_resume_file, file_path, file_ext, job_description, features
+    )
+    if result is None:
         raise HTTPException(status_code=400, detail="Failed to extract text from resume")
 
-    ats_score, ats_feedback = ats_screening(resume_text)
-    extracted_skills = extract_skills(resume_text)
-    experience_years = extract_experience(resume_text)
-    match_score = calculate_similarity(resume_text, job_description, extracted_skills, experience_years)
-    job_ranking = semantic_search(resume_text, job_description)
-
-    resume = Resume(
-        filename=file.filename,
-        skills=json.dumps(extracted_skills),
-        experience_years=float(experience_years),
-        match_score=match_score,
-        job_ranking=job_ranking,
-        ats_score=ats_score,
-        ats_feedback=ats_feedback,
-        job_description=job_description
+    entry = (file.filename, content_hash, result, embedding, fresh_features, job_description)
+    if write_behind.WRITE_BEHIND:
+        # Grouped with concurrent uploads; returns once the group is committed and indexed
+        with stage("db_commit"):
+            resume_id = await write_behind.get_committer().store(entry)
+    else:
+        with stage("db_commit"):
+            resume = store_scored(db, [entry])[0]
+            db.commit()
+            resume_id = resume.id
+        with stage("vector_index"):
+            get_vector_index().add([resume_id], [embedding])
+
+    return {
+        "id": resume_id,
+        "filename": file.filename,
+        "skills": result["skills"],
+        "experience_years": result["experience_years"],
+        "match_score": result["match_score"],
+        "job_ranking": result["job_ranking"],
+        "ats_score": result["ats_score"],
+        "ats_feedback": result["ats_feedback"],
+        "job_description": job_description
+    }
+
+@app.post("/match-resumes/batch")
+async def match_resumes_batch(
+    files: List[UploadFile] = File(...),
+    job_description: str = Form(...),
+    batch_size: int = Form(ENCODE_BATCH_SIZE),
+    db: Session = Depends(get_db)
+):
+    if batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be positive")
+
+    uploads = []
+    failed = []
+    for file in files:
+        file_ext = file.filename.split(".")[-1].lower()
+        if file_ext not in ["pdf", "docx"]:
+            failed.append({"filename": file.filename, "error": "Unsupported file format"})
+            continue
+        try:
+            content_hash, file_path = await save_upload(file, file_ext)
+        except UploadTooLarge as e:
+            failed.append({"filename": file.filename, "error": str(e)})
+            continue
+        uploads.append((file.filename, content_hash, file_path, file_ext, feature_store.get_features(db, content_hash)))
+
+    scored, extract_failed = await get_worker_pool().run(
+        score_resume_batch, uploads, job_description, batch_size=batch_size
     )
+    failed.extend(extract_failed)
 
-    db.add(resume)
-    db.commit()
-    db.refresh(resume)
+    results = []
+    if scored:
+        # Insert every row in a single transaction
+        resumes = store_scored(db, [(*row, job_description) for row in scored])
+        db.commit()
+        results = [{"id": r.id, "filename": filename, **result} for r, (filename, _, result, _, _) in zip(resumes, scored)]
+        get_vector_index().add([r.id for r in resumes], [embedding for _, _, _, embedding, _ in scored])
+
+    results.sort(key=lambda r: r["match_score"], reverse=True)
+    for rank, result in enumerate(results, start=1):
+        result["rank"] = rank
+
+    return {
+        "job_description": job_description,
+        "results": results,
+        "failed": failed,
+    }
+
+@app.post("/jobs/")
+async def submit_resume_job(
+    file: UploadFile = File(...),
+    job_description: str = Form(...)
+):
+    """Queues a resume for background processing and returns its job id."""
+    file_ext = file.filename.split(".")[-1].lower()
+    if file_ext not in ["pdf", "docx"]:
+        raise HTTPException(status_code=400, detail="Unsupported file format")
+
+    _, file_path = await save_upload(file, file_ext)
+
+    job_id = await asyncio.to_thread(job_queue.enqueue, file.filename, file_path, file_ext, job_description)
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/jobs/{job_id}")
+async def get_resume_job(job_id: str):
+    job = await asyncio.to_thread(job_queue.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {key: job[key] for key in ["id", "status", "stage", "filename", "result", "error", "created_at", "updated_at"]}
+
+@app.get("/jobs/{job_id}/events")
+async def stream_resume_job(job_id: str):
+    """Server-sent events with the job's progress until it finishes."""
+    if await asyncio.to_thread(job_queue.get_job, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        last = None
+        while True:
+            job = await asyncio.to_thread(job_queue.get_job, job_id)
+            state = (job["status"], job["stage"])
+            if state != last:
+                payload = {"status": job["status"], "stage": job["stage"], "error": job["error"], "result": job["result"]}
+                yield f"event: {job['status']}\ndata: {json.dumps(payload)}\n\n"
+                last = state
+            if job["status"] in ("done", "failed"):
+                break
+            await asyncio.sleep(job_queue.POLL_INTERVAL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.post("/search")
+async def search_resumes(
+    job_description: str = Form(...),
+    top_k: int = Form(10),
+    db: Session = Depends(get_db)
+):
+    """Finds the stored resumes closest to a job description."""
+    if not (1 <= top_k <= 1000):
+        raise HTTPException(status_code=400, detail="top_k must be between 1 and 1000")
+
+    hits = await get_worker_pool().run(search_similar, job_description, top_k)
+    resumes = {r.id: r for r in db.query(Resume).filter(Resume.id.in_([resume_id for resume_id, _ in hits]))}
 
     return {
-        "filename": resume.filename,
-        "skills": extracted_skills,
-        "experience_years": resume.experience_years,
-        "match_score": resume.match_score,
-        "job_ranking": resume.job_ranking,
-        "ats_score": resume.ats_score,
-        "ats_feedback": resume.ats_feedback,
-        "job_description": resume.job_description
+        "results": [{
+            "id": resume_id,
+            "filename": resumes[resume_id].filename,
+            "similarity": round(score * 100, 2),
+            "match_score": resumes[resume_id].match_score,
+            "skills": json.loads(resumes[resume_id].skills) if resumes[resume_id].skills else [],
+        } for resume_id, score in hits if resume_id in resumes]
+    }
+
+@app.post("/rescore")
+async def rescore_resumes(
+    job_description: str = Form(...),
+    resume_ids: List[int] = Form(None),
+    top_k: int = Form(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Scores stored resumes against a new job description.
+
+    Uses only the features saved when each resume was uploaded; no file is
+    re-read or re-parsed. Omit resume_ids to rescore every resume. Stored
+    Resume rows keep their original scores.
+    """
+    if top_k is not None and top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be positive")
+
+    results = []
+    found = set()
+    for rows in feature_store.iter_resume_features(db, resume_ids):
+        found.update(resume_id for resume_id, _, _ in rows)
+        results += await get_worker_pool().run(rescore_features, rows, job_description)
+    results.sort(key=lambda r: r["match_score"], reverse=True)
+    if top_k is not None:
+        results = results[:top_k]
+
+    response = {"job_description": job_description, "results": results}
+    if resume_ids is not None:
+        # Unknown ids, and resumes uploaded before features were stored
+        response["missing"] = [resume_id for resume_id in resume_ids if resume_id not in found]
+    return response
+
+def _screen_candidates(index, job_description, candidates):
+    """
+    Prefilter of /screen: refreshes the index and loads the candidates' features.
+
+    Both read the database and the refresh can scan the whole pool, so this
+    runs in a thread with its own session rather than on the event loop.
+    """
+    db = SessionLocal()
+    try:
+        index.refresh(db)
+        candidate_ids = index.candidates(job_description, candidates)
+        return [row for chunk in feature_store.iter_resume_features(db, candidate_ids) for row in chunk]
+    finally:
+        db.close()
+
+@app.post("/screen")
+async def screen_resumes(
+    job_description: str = Form(...),
+    top_k: int = Form(10),
+    candidates: int = Form(RETRIEVAL_CANDIDATES),
+):
+    """
+    Screens the whole stored resume pool against a job description.
+
+    A skill and TF-IDF prefilter narrows the pool to `candidates` resumes;
+    only those get the embedding similarity and the full weighted score.
+    Raising `candidates` trades speed for recall.
+    """
+    if not (1 <= top_k <= candidates <= 10000):
+        raise HTTPException(status_code=400, detail="Require 1 <= top_k <= candidates <= 10000")
+
+    index = get_candidate_index()
+    with stage("prefilter"):
+        rows = await asyncio.to_thread(_screen_candidates, index, job_description, candidates)
+    with stage("rerank"):
+        results = await get_worker_pool().run(rescore_features, rows, job_description)
+    results.sort(key=lambda r: r["match_score"], reverse=True)
+
+    return {
+        "job_description": job_description,
+        "pool_size": len(index),
+        "candidates_scored": len(rows),
+        "results": results[:top_k],
     }
 
 @app.post("/feedback/")
 async def collect_feedback(
-    filename: str,
     recruiter_rating: float,
+    filename: str = None,
+    resume_id: int = None,
     comments: str = None,
     db: Session = Depends(get_db)
 ):
     if not (0 <= recruiter_rating <= 5):
         raise HTTPException(status_code=400, detail="Rating must be between 0 and 5")
+    if resume_id is None and filename is None:
+        raise HTTPException(status_code=400, detail="Either resume_id or filename is required")
 
-    resume = db.query(Resume).filter(Resume.filename == filename).first()
+    if resume_id is not None:
+        resume = db.get(Resume, resume_id)
+    else:
+        # Filenames are not unique; feedback goes to the latest upload
+        resume = db.query(Resume).filter(Resume.filename == filename).order_by(Resume.id.desc()).first()
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    feedback_entry = Feedback(filename=filename, rating=recruiter_rating, comments=comments)
+    feedback_entry = Feedback(resume_id=resume.id, filename=resume.filename, rating=recruiter_rating, comments=comments)
     db.add(feedback_entry)
+    stats.record_feedback(db, recruiter_rating)
     db.commit()
     return {"message": "Feedback recorded successfully!"}
 
+@app.get("/resumes/")
+async def list_resumes(
+    skill: List[str] = Query(None),
+    min_score: float = None,
+    max_score: float = None,
+    min_experience: float = None,
+    max_experience: float = None,
+    sort: str = "id",
+    cursor: str = None,
+    limit: int = 50,
+    db: Session = Depends(get_db)
+):
+    """
+    Lists resumes with all filters applied in SQL, paginated by keyset.
+
+    Pass the returned `next_cursor` back as `cursor` to fetch the next page.
+    With sort=match_score results are ordered by score, highest first, and
+    unscored resumes (e.g. from ingest.py without a job description) come last.
+    """
+    if not (1 <= limit <= 500):
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 500")
+    if sort not in ("id", "match_score"):
+        raise HTTPException(status_code=400, detail="sort must be 'id' or 'match_score'")
+
+    query = db.query(Resume)
+    for name in skill or []:
+        query = query.filter(Resume.id.in_(select(ResumeSkill.resume_id).where(ResumeSkill.skill == name.lower())))
+    if min_score is not None:
+        query = query.filter(Resume.match_score >= min_score)
+    if max_score is not None:
+        query = query.filter(Resume.match_score <= max_score)
+    if min_experience is not None:
+        query = query.filter(Resume.experience_years >= min_experience)
+    if max_experience is not None:
+        query = query.filter(Resume.experience_years <= max_experience)
+
+    try:
+        if sort == "id":
+            if cursor:
+                query = query.filter(Resume.id > int(cursor))
+            query = query.order_by(Resume.id)
+        else:
+            if cursor:
+                last_score, last_id = cursor.split(":")
+                last_id = int(last_id)
+                if last_score == "null":
+                    query = query.filter(Resume.match_score.is_(None), Resume.id < last_id)
+                else:
+                    last_score = float(last_score)
+                    query = query.filter(or_(
+                        Resume.match_score < last_score,
+                        and_(Resume.match_score == last_score, Resume.id < last_id),
+                        Resume.match_score.is_(None),
+                    ))
+            query = query.order_by(Resume.match_score.desc().nulls_last(), Resume.id.desc())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    resumes = query.limit(limit).all()
+    next_cursor = None
+    if len(resumes) == limit:
+        last = resumes[-1]
+        if sort == "id":
+            next_cursor = str(last.id)
+        else:
+            next_cursor = f"{'null' if last.match_score is None else last.match_score}:{last.id}"
+
+    return {
+        "resumes": [{
+            "id": r.id,
+            "filename": r.filename,
+            "match_score": r.match_score,
+            "experience_years": r.experience_years,
+            "ats_score": r.ats_score,
+            "skills": r.get_skills(),
+        } for r in resumes],
+        "next_cursor": next_cursor,
+    }
+
 @app.get("/admin_dashboard/")
-async def admin_dashboard(db: Session = Depends(get_db)):
-    total_resumes = db.query(Resume).count()
-    resumes = db.query(Resume).all()
-    feedbacks = db.query(Feedback).all()
+async def admin_dashboard(
+    limit: int = 50,
+    cursor: int = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Dashboard totals from the running aggregates in stats.py.
 
-    avg_score = round(sum(r.match_score for r in resumes) / len(resumes), 2) if resumes else 0.0
-    recruiter_avg_rating = round(sum(f.rating for f in feedbacks) / len(feedbacks), 2) if feedbacks else 0.0
+    `processed_resumes` is one page of resumes, newest first; pass
+    `next_cursor` back as `cursor` for the next page.
+    """
+    if not (1 <= limit <= 500):
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 500")
 
-    all_skills = [json.loads(r.skills) if r.skills else [] for r in resumes]
-    flat_skills = [skill for sublist in all_skills for skill in sublist]
-    top_skills = Counter(flat_skills).most_common(5) if flat_skills else []
+    query = db.query(Resume.id, Resume.filename, Resume.match_score, Resume.skills)
+    if cursor is not None:
+        query = query.filter(Resume.id < cursor)
+    page = query.order_by(Resume.id.desc()).limit(limit).all()
 
     processed_resumes = [{
+        "id": r.id,
         "filename": r.filename,
         "match_score": r.match_score,
         "skills": json.loads(r.skills) if r.skills else []
-    } for r in resumes]
+    } for r in page]
 
     return {
-        "total_resumes": total_resumes,
-        "average_match_score": avg_score,
-        "recruiter_average_rating": recruiter_avg_rating,
-        "top_skills": top_skills,
-        "feedback_count": len(feedbacks),
+        **stats.read_stats(db),
         "processed_resumes": processed_resumes,
+        "next_cursor": page[-1].id if len(page) == limit else None,
     }
 
+def _export_response(query, fmt, name):
+    if fmt not in export.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
+    return StreamingResponse(
+        export.stream_rows(query, fmt),
+        media_type=export.EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+@app.get("/export/resumes")
+async def export_resumes(
+    format: str = "ndjson",
+    skill: List[str] = Query(None),
+    min_score: float = None,
+    max_score: float = None,
+    created_after: datetime = None,
+    created_before: datetime = None,
+    after_id: int = None,
+):
+    """
+    Streams every matching resume as CSV or NDJSON, in id order.
+
+    Dates are UTC. To resume an interrupted export, pass the last id
+    received as `after_id`.
+    """
+    query = export.resume_query(skill, min_score, max_score, created_after, created_before, after_id)
+    return _export_response(query, format, "resumes")
+
+@app.get("/export/feedback")
+async def export_feedback(format: str = "ndjson", resume_id: int = None, after_id: int = None):
+    """Streams feedback rows as CSV or NDJSON, in id order; resume with `after_id`."""
+    return _export_response(export.feedback_query(resume_id, after_id), format, "feedback")
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,33 +1,24 @@
 import pdfplumber
 import docx
 import re
-import spacy
 import fitz  # PyMuPDF
-import nltk
-from nltk.corpus import stopwords
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import util
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from collections import Counter
-
-# Load NLP Model
-nlp = spacy.load("en_core_web_sm")
-
-# Load Pre-trained BERT Model
-bert_model = SentenceTransformer("all-MiniLM-L6-v2")
-
-# Download stopwords (only needed once)
-nltk.download("stopwords")
-stop_words = set(stopwords.words("english"))
-
-# Expanded Skill Database
-SKILL_DATABASE = {
-    "python", "java", "c++", "javascript", "typescript", "react", "node.js", "sql",
-    "machine learning", "deep learning", "nlp", "tensorflow", "pytorch", "html", "css",
-    "flask", "django", "docker", "kubernetes", "aws", "azure", "gcp", "linux", "git",
-    "bash", "agile", "scrum", "data science", "pandas", "numpy", "matplotlib", "fastapi",
-    "microservices", "mongodb", "postgresql", "graphql", "llm", "bert", "transformers"
-}
+from functools import lru_cache
+from bisect import bisect_right
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from model_registry import parse, parse_many, SPACY_BATCH_SIZE, SPACY_N_PROCESS
+from embedding_cache import encode_texts
+from vector_index import normalize_rows
+from skills import get_skill_engine
+from analysis import analyze_resume
+from metrics import stage, count_fallback
+from tfidf_model import get_tfidf_model
+
+# Returned by extract_text_from_pdf when neither extractor finds any text
+NO_TEXT_FOUND = "No text found."
 
 # Function to Extract Text from PDF
 def extract_text_from_pdf(pdf_path):
@@ -39,42 +30,66 @@ def extract_text_from_pdf(pdf_path):
     text = ""
 
     try:
-        with fitz.open(pdf_path) as doc:
-            text = " ".join([page.get_text("text") for page in doc])
+        with stage("pdf_pymupdf"):
+            with fitz.open(pdf_path) as doc:
+                text = " ".join([page.get_text("text") for page in doc])
     except Exception as e:
         print(f"PyMuPDF error: {e}")
 
     if not text.strip():
+        count_fallback("pymupdf", "pdfplumber")
         try:
-            with pdfplumber.open(pdf_path) as pdf:
+            with stage("pdf_pdfplumber"), pdfplumber.open(pdf_path) as pdf:
                 text = " ".join([page.extract_text() for page in pdf.pages if page.extract_text()])
         except Exception as e:
             print(f"pdfplumber error: {e}")
 
-    return text.strip() if text else "No text found."
+    return text.strip() if text else NO_TEXT_FOUND
 
 # Function to Extract Text from DOCX
 def extract_text_from_docx(docx_path):
-    return "\n".join([para.text for para in docx.Document(docx_path).paragraphs])
+    with stage("docx"):
+        return "\n".join([para.text for para in docx.Document(docx_path).paragraphs])
 
 # Function to Extract Skills using NLP
+def _skills_from_doc(doc):
+    """
+    Keeps skill matches from the skill engine that overlap a noun or proper noun.
+    """
+    noun_spans = [(token.idx, token.idx + len(token)) for token in doc if token.pos_ in ["NOUN", "PROPN"]]
+    noun_starts = [start for start, _ in noun_spans]
+
+    # Tokens do not overlap, so only the last noun starting before the match end can qualify
+    skills = set()
+    for skill, start, end in get_skill_engine().find(doc.text):
+        i = bisect_right(noun_starts, end - 1) - 1
+        if i >= 0 and noun_spans[i][1] > start:
+            skills.add(skill)
+    return list(skills)
+
 def extract_skills(resume_text):
     """
     Extracts skills from the resume text using NLP (spaCy + NLTK).
+    Only the components needed for POS tags are run.
     """
-    doc = nlp(resume_text)
-    skills = {token.text.lower() for token in doc if token.pos_ in ["NOUN", "PROPN"] and token.text.lower() in SKILL_DATABASE}
-    
-    return list(skills)
+    with stage("spacy"):
+        doc = parse(resume_text, mode="pos")
+    return _skills_from_doc(doc)
+
+def extract_skills_bulk(resume_texts, batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS):
+    """
+    Extracts skills from many resumes with a single nlp.pipe pass.
+    """
+    with stage("spacy"):
+        docs = list(parse_many(resume_texts, mode="pos", batch_size=batch_size, n_process=n_process))
+    return [_skills_from_doc(doc) for doc in docs]
 
 # Function to Extract Keywords
 def extract_keywords(text, top_n=10):
     """
     Extracts the most frequent keywords (excluding stopwords).
     """
-    words = re.findall(r"\b\w+\b", text.lower())
-    filtered_words = [word for word in words if word not in stop_words and len(word) > 2]
-    return Counter(filtered_words).most_common(top_n)
+    return list(analyze_resume(text).keyword_counts[:top_n])
 
 # Function to Optimize Resume for ATS
 def optimize_resume_for_ats(text):
@@ -84,29 +99,27 @@ def optimize_resume_for_ats(text):
     - Converts to plain text.
     - Checks if essential sections exist.
     """
-    text = re.sub(r"[^a-zA-Z0-9\s.,]", "", text)
-
     required_sections = {"experience", "skills", "education", "projects"}
-    missing_sections = {section for section in required_sections if section.lower() not in text.lower()}
+    missing_sections = required_sections - analyze_resume(text).sections
 
+    text = re.sub(r"[^a-zA-Z0-9\s.,]", "", text)
     return {"optimized_text": text, "missing_sections": list(missing_sections)}
 
 # Function to Calculate Resume Match Score (TF-IDF + BERT)
 def match_resume_with_job(resume_text, job_description):
     """
     Calculates the resume-job match score using:
-    - TF-IDF for lexical similarity.
+    - TF-IDF with corpus-level IDF for lexical similarity.
     - BERT for semantic similarity.
     - Skill match weight.
     """
 
-    # TF-IDF Cosine Similarity
-    vectorizer = TfidfVectorizer()
-    tfidf_matrix = vectorizer.fit_transform([resume_text, job_description])
-    tfidf_similarity = cosine_similarity(tfidf_matrix)[0][1]
+    # TF-IDF Cosine Similarity (corpus IDF)
+    with stage("tfidf"):
+        tfidf_similarity = get_tfidf_model().similarity(resume_text, job_description)
 
     # BERT Semantic Similarity
-    embeddings = bert_model.encode([resume_text, job_description])
+    embeddings = encode_texts([resume_text, job_description])
     bert_similarity = util.pytorch_cos_sim(embeddings[0], embeddings[1]).item()
 
     # Extract skills from resume
@@ -119,11 +132,73 @@ def match_resume_with_job(resume_text, job_description):
     
     return round(final_score * 100, 2)  # Convert to percentage
 
+# Precomputed Job Catalog
+class JobCatalog:
+    """
+    Precomputed features for a fixed list of job descriptions.
+
+    The catalog stores one TF-IDF matrix fitted over all jobs, the normalized
+    job embeddings and a job x skill matrix, so scoring a resume against every
+    job is one encode plus a few matrix-vector products.
+    """
+
+    def __init__(self, job_descriptions):
+        self.jobs = list(job_descriptions)
+
+        self.vectorizer = TfidfVectorizer()
+        self.tfidf_matrix = self.vectorizer.fit_transform(self.jobs)
+        self.embeddings = normalize_rows(encode_texts(self.jobs))
+
+        # skill_matrix[j, s] = 1 when skill s appears in job j (same test as match_resume_with_job)
+        self.skills = sorted(get_skill_engine().skills)
+        self.skill_index = {skill: i for i, skill in enumerate(self.skills)}
+        rows, cols = [], []
+        for j, job in enumerate(self.jobs):
+            lowered = job.lower()
+            for s, skill in enumerate(self.skills):
+                if skill in lowered:
+                    rows.append(j)
+                    cols.append(s)
+        self.skill_matrix = csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(self.jobs), len(self.skills)),
+        )
+
+    def scores(self, resume_text):
+        """Returns the weighted match score (0-100) of the resume against every job."""
+        tfidf_similarity = (self.tfidf_matrix @ self.vectorizer.transform([resume_text]).T).toarray().ravel()
+        bert_similarity = self.embeddings @ normalize_rows(encode_texts([resume_text]))[0]
+
+        extracted_skills = extract_skills(resume_text)
+        if extracted_skills:
+            resume_skills = np.zeros(len(self.skills), dtype=np.float32)
+            resume_skills[[self.skill_index[skill] for skill in extracted_skills]] = 1
+            skill_weight = (self.skill_matrix @ resume_skills) / len(extracted_skills)
+        else:
+            skill_weight = np.zeros(len(self.jobs), dtype=np.float32)
+
+        final_score = (0.5 * tfidf_similarity) + (0.4 * bert_similarity) + (0.1 * skill_weight)
+        return final_score * 100
+
+    def recommend(self, resume_text, top_k=3):
+        """Returns the top_k (job, score) pairs for the resume."""
+        scores = self.scores(resume_text)
+        top_k = min(top_k, len(self.jobs))
+        best = np.argpartition(scores, -top_k)[-top_k:]
+        best = best[np.argsort(-scores[best])]
+        return [(self.jobs[i], round(float(scores[i]), 2)) for i in best]
+
+@lru_cache(maxsize=8)
+def get_job_catalog(job_descriptions):
+    """Returns a cached JobCatalog for a tuple of job descriptions."""
+    return JobCatalog(job_descriptions)
+
 # Function to Recommend Jobs
 def recommend_jobs(resume_text, job_descriptions):
     """
     Matches the resume to a list of job descriptions using semantic similarity.
     Returns top 3 job recommendations.
     """
-    job_scores = [(job, match_resume_with_job(resume_text, job)) for job in job_descriptions]
-    return sorted(job_scores, key=lambda x: x[1], reverse=True)[:3]  # Return top 3 matches
+    if not job_descriptions:
+        return []  # an empty catalog has no vocabulary to fit
+    return get_job_catalog(tuple(job_descriptions)).recommend(resume_text, top_k=3)
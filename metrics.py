@@ -0,0 +1,212 @@
+"""
+Lightweight in-process metrics in the Prometheus text exposition format.
+
+Pipeline code wraps its stages in `stage("name")`, which records the time in
+the `resume_matcher_stage_seconds` histogram and, while a request is being
+traced, in that request's Server-Timing entries. Recording is a perf_counter
+call, a bisect and a locked increment, so it stays on all the time.
+
+Metrics live in the process that records them: with WORKER_POOL=process the
+stage timings of the pool workers and of the job_queue worker processes are
+not visible on /metrics.
+"""
+import bisect
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Send a Server-Timing header with every response ("1" to enable)
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "0") == "1"
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = []
+# Per-request {stage: seconds}, set by start_request() while a request is traced
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    Base for counters and gauges.
+
+    Pass `callback` to read the value at scrape time instead of recording it;
+    the callback returns a number, or a {label value tuple: number} dict.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(labels[name] for name in self.labelnames)
+
+    def _samples(self):
+        if self.callback is not None:
+            value = self.callback()
+            values = list(value.items()) if isinstance(value, dict) else [((), value)]
+        else:
+            with self._lock:
+                values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += self._samples()
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def _samples(self):
+        with self._lock:
+            series = [(key, list(values)) for key, values in self._series.items()]
+        lines = []
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values[:-1]):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(values[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render():
+    """All registered metrics in the Prometheus text format."""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+STAGE_SECONDS = Histogram(
+    "resume_matcher_stage_seconds", "Time spent in each resume processing stage.", ["stage"]
+)
+EXTRACTION_FALLBACKS = Counter(
+    "resume_matcher_extraction_fallbacks_total",
+    "Documents or pages that fell back to a slower text extractor.",
+    ["source", "fallback"],
+)
+DB_SECONDS = Histogram(
+    "resume_matcher_db_statement_seconds", "Time spent executing SQL statements.", ["operation"]
+)
+REQUEST_SECONDS = Histogram(
+    "resume_matcher_http_request_seconds", "HTTP request latency by route.", ["method", "route", "status"]
+)
+
+
+def _record(name, elapsed):
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + elapsed
+
+
+@contextmanager
+def stage(name):
+    """Times the enclosed block as pipeline stage `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        _record(name, elapsed)
+
+
+def count_fallback(source, fallback, amount=1):
+    EXTRACTION_FALLBACKS.inc(amount, source=source, fallback=fallback)
+
+
+def instrument_engine(engine):
+    """Records the execution time of every statement run through `engine`."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_start"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_SECONDS.observe(elapsed, operation=operation)
+        _record("db", elapsed)
+
+
+def start_request():
+    """Starts collecting Server-Timing entries for the current request."""
+    return _request_timings.set({})
+
+
+def finish_request(token):
+    """Stops collecting and returns the Server-Timing header value."""
+    timings = _request_timings.get() or {}
+    _request_timings.reset(token)
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items())
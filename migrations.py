@@ -0,0 +1,120 @@
+"""
+Brings an existing resume_matcher.db up to the current schema.
+
+Safe to run repeatedly; main.py runs it at startup. To run by hand:
+
+    python migrations.py
+"""
+import json
+import logging
+
+from sqlalchemy import inspect, text, LargeBinary, DateTime
+from sqlalchemy.orm import Session
+
+from database import engine, Base, AppliedMigration
+import stats
+import tfidf_model
+
+BACKFILL_CHUNK = 1000
+
+
+def _add_missing_columns(conn):
+    feedback_columns = {column["name"] for column in inspect(conn).get_columns("feedback")}
+    if "resume_id" not in feedback_columns:
+        logging.info("Adding feedback.resume_id")
+        conn.execute(text("ALTER TABLE feedback ADD COLUMN resume_id INTEGER REFERENCES resumes(id)"))
+    resume_columns = {column["name"] for column in inspect(conn).get_columns("resumes")}
+    if "content_hash" not in resume_columns:
+        # Older rows stay NULL: their files were not content-addressed, so they cannot be rescored
+        logging.info("Adding resumes.content_hash")
+        conn.execute(text("ALTER TABLE resumes ADD COLUMN content_hash VARCHAR(64)"))
+    if "job_id" not in resume_columns:
+        logging.info("Adding resumes.job_id")
+        conn.execute(text("ALTER TABLE resumes ADD COLUMN job_id VARCHAR(32)"))
+    if "created_at" not in resume_columns:
+        # Upload times of older rows are unknown; they stay NULL and match no date filter
+        logging.info("Adding resumes.created_at")
+        timestamp = DateTime().compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE resumes ADD COLUMN created_at {timestamp}"))
+    feature_columns = {column["name"] for column in inspect(conn).get_columns("resume_features")}
+    if "term_counts" not in feature_columns:
+        logging.info("Adding resume_features.term_counts")
+        blob = LargeBinary().compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE resume_features ADD COLUMN term_counts {blob}"))
+
+
+def _create_missing_indexes(conn):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+
+def _backfill_resume_skills(conn):
+    """Copies the JSON skills of resumes that have no resume_skills rows yet."""
+    last_id = 0
+    while True:
+        rows = conn.execute(text(
+            "SELECT id, skills FROM resumes "
+            "WHERE id > :last_id AND id NOT IN (SELECT resume_id FROM resume_skills) "
+            "ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": BACKFILL_CHUNK}).fetchall()
+        if not rows:
+            break
+        links = []
+        for resume_id, skills in rows:
+            try:
+                skill_list = json.loads(skills) if skills else []
+            except ValueError:
+                skill_list = []
+            links += [{"resume_id": resume_id, "skill": skill} for skill in dict.fromkeys(skill_list)]
+        if links:
+            conn.execute(text("INSERT INTO resume_skills (resume_id, skill) VALUES (:resume_id, :skill)"), links)
+        last_id = rows[-1][0]
+
+
+def _backfill_feedback_resume_ids(conn):
+    """Links old feedback rows to the latest resume with the same filename."""
+    conn.execute(text(
+        "UPDATE feedback SET resume_id = "
+        "(SELECT MAX(resumes.id) FROM resumes WHERE resumes.filename = feedback.filename) "
+        "WHERE resume_id IS NULL"
+    ))
+
+
+# Data backfills run once per database; completion is recorded in applied_migrations
+BACKFILLS = {
+    "resume_skills": _backfill_resume_skills,
+    "feedback_resume_ids": _backfill_feedback_resume_ids,
+}
+
+
+def _run_backfills(conn):
+    table = AppliedMigration.__table__
+    applied = set(conn.execute(table.select().with_only_columns(table.c.name)).scalars())
+    for name, backfill in BACKFILLS.items():
+        if name in applied:
+            continue
+        logging.info(f"Running backfill {name}")
+        backfill(conn)
+        conn.execute(table.insert().values(name=name))
+
+
+def migrate(bind=engine):
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        _add_missing_columns(conn)
+        _create_missing_indexes(conn)
+        _run_backfills(conn)
+
+    # Seed the dashboard aggregates and the TF-IDF corpus the first time they are needed
+    with Session(bind=bind) as db:
+        if not stats.is_initialized(db):
+            stats.rebuild(db)
+        if not tfidf_model.is_initialized(db):
+            tfidf_model.rebuild(db)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate()
+    print("Database schema is up to date.")
@@ -0,0 +1,170 @@
+import gc
+import logging
+import os
+import threading
+
+# Model names can be overridden per deployment
+SPACY_MODEL = os.environ.get("SPACY_MODEL", "en_core_web_sm")
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+# Embedding inference profile: "fp32", or "int8" for dynamic int8 quantization
+# of the Linear layers (smaller and faster on CPU, scores shift slightly)
+EMBEDDING_PROFILE = os.environ.get("EMBEDDING_PROFILE", "fp32")
+EMBEDDING_PROFILES = ("fp32", "int8")
+
+# Defaults for bulk spaCy processing with nlp.pipe
+SPACY_BATCH_SIZE = int(os.environ.get("SPACY_BATCH_SIZE", "64"))
+SPACY_N_PROCESS = int(os.environ.get("SPACY_N_PROCESS", "1"))
+
+# spaCy components each analysis mode needs; the rest are disabled per call.
+# None keeps the whole pipeline.
+ANALYSIS_MODES = {
+    "full": None,
+    "pos": {"tok2vec", "tagger", "attribute_ruler"},
+    "tokenize": set(),
+}
+
+# Set PRELOAD_MODELS=1 (e.g. with `gunicorn --preload`) to load models in the
+# master process so forked workers share the weights copy-on-write.
+PRELOAD_MODELS = os.environ.get("PRELOAD_MODELS", "0") == "1"
+
+_models = {}
+_lock = threading.Lock()
+_ready = threading.Event()
+
+
+def _get_or_load(name, loader):
+    """
+    Returns the cached model for `name`, loading it exactly once per process.
+    """
+    model = _models.get(name)
+    if model is None:
+        with _lock:
+            model = _models.get(name)
+            if model is None:
+                logging.info(f"Loading model: {name}")
+                model = loader()
+                _models[name] = model
+    return model
+
+
+def _load_spacy():
+    import spacy
+    return spacy.load(SPACY_MODEL)
+
+
+def load_embedding_model(profile=EMBEDDING_PROFILE):
+    """
+    Loads a fresh SentenceTransformer for the given inference profile.
+
+    Use get_bert_model() for the shared instance; this is for callers that
+    need a specific profile, such as benchmarks comparing them.
+    """
+    if profile not in EMBEDDING_PROFILES:
+        raise ValueError(f"Unknown embedding profile: {profile}")
+    from sentence_transformers import SentenceTransformer
+    if profile == "fp32":
+        return SentenceTransformer(EMBEDDING_MODEL)
+
+    import torch
+    from torch.ao.quantization import quantize_dynamic
+    model = SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+    quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
+
+
+def _load_bert():
+    return load_embedding_model(EMBEDDING_PROFILE)
+
+
+def configure_torch_threads(intra_op_threads, inter_op_threads=None):
+    """
+    Sets torch's intra-op (per operator) and inter-op (parallel operators)
+    thread pools for this process.
+
+    The inter-op pool can only be sized before torch first uses it, so call
+    this at worker start-up, before any model runs.
+    """
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(intra_op_threads)
+    if inter_op_threads:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError as e:
+            logging.warning(f"Could not set torch inter-op threads: {e}")
+
+
+def _load_stop_words():
+    import nltk
+    from nltk.corpus import stopwords
+    try:
+        return set(stopwords.words("english"))
+    except LookupError:
+        # Download stopwords only when they are not available locally
+        nltk.download("stopwords", quiet=True)
+        return set(stopwords.words("english"))
+
+
+def get_nlp():
+    """Returns the shared spaCy pipeline."""
+    return _get_or_load("nlp", _load_spacy)
+
+
+def disabled_components(mode):
+    """Names of the loaded spaCy components that `mode` does not use."""
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(f"Unknown analysis mode: {mode}")
+    needed = ANALYSIS_MODES[mode]
+    if needed is None:
+        return []
+    return [name for name in get_nlp().pipe_names if name not in needed]
+
+
+def parse(text, mode="full"):
+    """Runs spaCy on one text with only the components `mode` needs."""
+    return get_nlp()(text, disable=disabled_components(mode))
+
+
+def parse_many(texts, mode="full", batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS):
+    """Runs spaCy over many texts with nlp.pipe, yielding docs in order."""
+    return get_nlp().pipe(texts, disable=disabled_components(mode), batch_size=batch_size, n_process=n_process)
+
+
+def get_bert_model():
+    """Returns the shared SentenceTransformer model."""
+    return _get_or_load("bert_model", _load_bert)
+
+
+def get_stop_words():
+    """Returns the shared set of English stopwords."""
+    return _get_or_load("stop_words", _load_stop_words)
+
+
+def warm_up():
+    """
+    Loads every model up front so the first request does not pay for it.
+    """
+    get_nlp()
+    get_bert_model()
+    get_stop_words()
+    _ready.set()
+
+
+def is_ready():
+    """True once all models have been loaded by `warm_up`."""
+    return _ready.is_set()
+
+
+def preload_for_fork():
+    """
+    Loads models in the parent process before workers are forked.
+
+    Freezing the GC moves the loaded objects into the permanent generation so
+    collections in the children do not touch (and copy) their pages.
+    """
+    warm_up()
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,270 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+
+import numpy as np
+
+from matcher import extract_skills, extract_skills_bulk, extract_text_from_pdf, extract_text_from_docx
+from embedding_cache import encode_texts
+from database import Resume
+from vector_index import normalize_rows, get_vector_index
+from tfidf_model import term_counts, record_job_description
+import feature_store
+import stats
+from utils import (
+    encode_pair, embedding_similarity, tfidf_similarity, tfidf_similarity_many, weighted_score,
+    extract_experience, ats_screening,
+)
+
+
+class ScoringPipeline:
+    """
+    Scores one resume against one job description.
+
+    Every intermediate (embeddings, TF-IDF similarity, skills, experience) is
+    computed at most once and shared by all derived scores.
+    """
+
+    def __init__(self, resume_text, job_description, embeddings=None, features=None, skills=None):
+        self.resume_text = resume_text
+        self.job_description = job_description
+        if embeddings is not None:
+            self.embeddings = embeddings
+        if skills is not None:
+            self.skills = skills
+        if features is not None:
+            # Job-independent features from a previous run on the same resume
+            self.skills = features["skills"]
+            self.experience_years = features["experience_years"]
+            self.ats = (features["ats_score"], features["ats_feedback"])
+
+    @cached_property
+    def embeddings(self):
+        return encode_pair(self.resume_text, self.job_description)
+
+    @cached_property
+    def semantic_similarity(self):
+        return embedding_similarity(self.embeddings)
+
+    @cached_property
+    def tfidf_similarity(self):
+        return tfidf_similarity(self.resume_text, self.job_description)
+
+    @cached_property
+    def skills(self):
+        return extract_skills(self.resume_text)
+
+    @cached_property
+    def experience_years(self):
+        return extract_experience(self.resume_text)
+
+    @cached_property
+    def ats(self):
+        """(ats_score, ats_feedback) for the resume."""
+        return ats_screening(self.resume_text)
+
+    @property
+    def match_score(self):
+        return weighted_score(
+            self.semantic_similarity, self.tfidf_similarity,
+            self.job_description, self.skills, self.experience_years,
+        )
+
+    @property
+    def job_ranking(self):
+        return round(self.semantic_similarity * 100, 2)
+
+    def features(self):
+        """Job-independent features that can be reused for the same resume."""
+        ats_score, ats_feedback = self.ats
+        return {
+            "text": self.resume_text,
+            "skills": self.skills,
+            "experience_years": self.experience_years,
+            "ats_score": ats_score,
+            "ats_feedback": ats_feedback,
+            "term_counts": term_counts(self.resume_text),
+        }
+
+    def result(self):
+        """All scores for the resume, in the shape stored on `Resume`."""
+        ats_score, ats_feedback = self.ats
+        return {
+            "skills": self.skills,
+            "experience_years": float(self.experience_years),
+            "match_score": self.match_score,
+            "job_ranking": self.job_ranking,
+            "ats_score": ats_score,
+            "ats_feedback": ats_feedback,
+        }
+
+
+def build_resume(filename, result, job_description, content_hash=None):
+    """Builds a Resume row (with its resume_skills rows) from a ScoringPipeline result."""
+    resume = Resume(
+        filename=filename,
+        experience_years=result["experience_years"],
+        match_score=result["match_score"],
+        job_ranking=result["job_ranking"],
+        ats_score=result["ats_score"],
+        ats_feedback=result["ats_feedback"],
+        job_description=job_description,
+        content_hash=content_hash,
+    )
+    resume.set_skills(result["skills"])
+    return resume
+
+
+def store_scored(db, entries):
+    """
+    Adds scored resumes to the session and returns their Resume rows.
+
+    `entries` are (filename, content_hash, result, embedding, fresh_features,
+    job_description) tuples. Also stores fresh features, records the job
+    descriptions in the TF-IDF corpus and updates the dashboard counters;
+    the caller commits, then adds the embeddings to the vector index.
+    """
+    resumes = [
+        build_resume(filename, result, job_description, content_hash)
+        for filename, content_hash, result, _, _, job_description in entries
+    ]
+    db.add_all(resumes)
+    stored = set()
+    for _, content_hash, _, embedding, fresh_features, _ in entries:
+        if fresh_features is not None and content_hash not in stored:
+            feature_store.save_features(db, content_hash, fresh_features, embedding)
+            stored.add(content_hash)
+    for job_description in dict.fromkeys(entry[5] for entry in entries):
+        if job_description:
+            record_job_description(db, job_description)
+    stats.record_resumes(db, resumes)
+    return resumes
+
+
+def extract_resume_text(file_path, file_ext):
+    return extract_text_from_pdf(file_path) if file_ext == "pdf" else extract_text_from_docx(file_path)
+
+
+def stored_embeddings(features, job_description):
+    """(resume, job) embeddings when the stored resume embedding is current, else None."""
+    if features is None or features["embedding"] is None:
+        return None
+    return features["embedding"], encode_texts([job_description])[0]
+
+
+def score_resume_file(file_path, file_ext, job_description, features=None):
+    """
+    Extracts and scores one resume file.
+
+    Pass the file's stored `features` (see feature_store) to skip extraction
+    and, when the stored embedding is current, the resume encode.
+
+    Returns (result, resume_embedding, fresh_features), or (None, None, None)
+    when no text could be extracted. fresh_features are the features to store
+    for the file, or None when they came from the store. Runs inside the
+    worker pool, so it must stay picklable.
+    """
+    resume_text = features["text"] if features is not None else extract_resume_text(file_path, file_ext)
+    if not resume_text.strip():
+        return None, None, None
+    pipeline = ScoringPipeline(
+        resume_text, job_description, embeddings=stored_embeddings(features, job_description), features=features
+    )
+    result = pipeline.result()
+    return result, pipeline.embeddings[0], pipeline.features() if features is None else None
+
+
+def score_resume_batch(uploads, job_description, batch_size=32, extract_workers=4):
+    """
+    Extracts and scores many (filename, content_hash, file_path, file_ext, features) uploads.
+
+    Files without stored features are extracted concurrently, then every
+    resume without a current stored embedding and the job description go
+    through one batched encode. Returns (scored, failed) where scored is a
+    list of (filename, content_hash, result, resume_embedding, fresh_features).
+    """
+    def load(upload):
+        _, _, file_path, file_ext, features = upload
+        return features["text"] if features is not None else extract_resume_text(file_path, file_ext)
+
+    with ThreadPoolExecutor(max_workers=extract_workers) as executor:
+        texts = list(executor.map(load, uploads))
+
+    extracted = []
+    failed = []
+    for (filename, content_hash, _, _, features), text in zip(uploads, texts):
+        if text.strip():
+            extracted.append((filename, content_hash, text, features))
+        else:
+            failed.append({"filename": filename, "error": "Failed to extract text from resume"})
+    if not extracted:
+        return [], failed
+
+    # The job description is encoded once, alongside the resumes that need it
+    to_encode = [text for _, _, text, features in extracted if features is None or features["embedding"] is None]
+    encoded = encode_texts(to_encode + [job_description], batch_size=batch_size)
+    jd_embedding = encoded[-1]
+    encoded = iter(encoded[:-1])
+
+    # Skills for resumes without stored features come from one nlp.pipe pass
+    fresh_texts = [text for _, _, text, features in extracted if features is None]
+    fresh_skills = iter(extract_skills_bulk(fresh_texts) if fresh_texts else [])
+
+    scored = []
+    for filename, content_hash, text, features in extracted:
+        stored = features["embedding"] if features is not None else None
+        embedding = stored if stored is not None else next(encoded)
+        skills = next(fresh_skills) if features is None else None
+        pipeline = ScoringPipeline(
+            text, job_description, embeddings=(embedding, jd_embedding), features=features, skills=skills
+        )
+        fresh_features = pipeline.features() if features is None else None
+        scored.append((filename, content_hash, pipeline.result(), embedding, fresh_features))
+    return scored, failed
+
+
+def search_similar(job_description, top_k):
+    """Encodes a job description and returns the `top_k` closest stored resumes as (id, similarity)."""
+    return get_vector_index().search(encode_texts([job_description])[0], top_k=top_k)
+
+
+def rescore_features(rows, job_description):
+    """
+    Scores stored resumes against a job description from their features alone.
+
+    `rows` are (resume_id, filename, features) from feature_store. Embedding
+    and TF-IDF similarities are computed for the whole batch at once; no file
+    is read. Returns one result dict per row, in order.
+    """
+    if not rows:
+        return []
+    texts = [features["text"] for _, _, features in rows]
+    counts = [
+        features["term_counts"] if features["term_counts"] is not None else term_counts(features["text"])
+        for _, _, features in rows
+    ]
+
+    # Resumes whose stored embedding is missing or stale go through the cache
+    stale = [i for i, (_, _, features) in enumerate(rows) if features["embedding"] is None]
+    encoded = encode_texts([texts[i] for i in stale] + [job_description])
+    embeddings = [features["embedding"] for _, _, features in rows]
+    for i, vector in zip(stale, encoded[:-1]):
+        embeddings[i] = vector
+
+    similarities = normalize_rows(np.vstack(embeddings)) @ normalize_rows(encoded[-1:])[0]
+    tfidf_scores = tfidf_similarity_many(counts, job_description)
+
+    results = []
+    for (resume_id, filename, features), similarity, tfidf_score in zip(rows, similarities, tfidf_scores):
+        similarity = float(similarity)
+        results.append({
+            "id": resume_id,
+            "filename": filename,
+            "skills": features["skills"],
+            "experience_years": features["experience_years"],
+            "match_score": weighted_score(
+                similarity, float(tfidf_score), job_description, features["skills"], features["experience_years"]
+            ),
+            "job_ranking": round(similarity * 100, 2),
+            "ats_score": features["ats_score"],
+        })
+    return results
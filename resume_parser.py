@@ -1,29 +1,27 @@
 import pytesseract
-from pdf2image import convert_from_path
-import spacy
-import re
+from pdf2image import convert_from_path, pdfinfo_from_path
+import fitz  # PyMuPDF
+import os
 import cv2
 import numpy as np
 import logging
-from datetime import datetime
-from sentence_transformers import SentenceTransformer, util
-from fuzzywuzzy import process
-from sklearn.feature_extraction.text import TfidfVectorizer
+from concurrent.futures import ThreadPoolExecutor
+from sentence_transformers import util
+
+from skills import get_skill_engine
+from analysis import analyze_resume
+from embedding_cache import encode_texts
+from metrics import stage, count_fallback
+from tfidf_model import get_tfidf_model
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Load NLP model
-nlp = spacy.load("en_core_web_sm")
-bert_model = SentenceTransformer("all-MiniLM-L6-v2")
-
-# Skill Database with fuzzy matching
-SKILL_DATABASE = [
-    "python", "java", "c++", "javascript", "typescript", "react", "node.js", "sql",
-    "machine learning", "deep learning", "nlp", "tensorflow", "pytorch", "flask",
-    "django", "fastapi", "docker", "aws", "azure", "gcp", "linux", "git",
-    "data science", "pandas", "numpy", "matplotlib", "keras", "cv", "llm", "mlops"
-]
+# OCR settings: render resolution and how many pages are rasterized/OCR'd at once
+OCR_DPI = int(os.environ.get("OCR_DPI", "300"))
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", str(os.cpu_count() or 1)))
+# Pages whose text layer is shorter than this are treated as scanned
+MIN_PAGE_TEXT_CHARS = 20
 
 def preprocess_image(image):
     """
@@ -32,67 +30,73 @@ def preprocess_image(image):
     gray = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2GRAY)
     return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
 
-def extract_text_from_pdf(pdf_path):
+def ocr_page(pdf_path, page_number, dpi=OCR_DPI):
+    """
+    Rasterizes a single page (1-based) and runs OCR on it.
+    """
+    try:
+        with stage("ocr_page"):
+            images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)
+            return "\n".join(pytesseract.image_to_string(preprocess_image(img), config='--psm 6') for img in images)
+    except Exception as e:
+        logging.error(f"Error running OCR on page {page_number}: {e}")
+        return ""
+
+def extract_text_layer(pdf_path):
     """
-    Extracts text from a PDF using OCR.
+    Returns the embedded text of every page, or None if the PDF cannot be read.
     """
-    text = ""
     try:
-        images = convert_from_path(pdf_path)
-        for img in images:
-            processed_img = preprocess_image(img)
-            text += pytesseract.image_to_string(processed_img, config='--psm 6') + "\n"
+        with stage("pdf_pymupdf"), fitz.open(pdf_path) as doc:
+            return [page.get_text("text") for page in doc]
     except Exception as e:
-        logging.error(f"Error extracting text: {e}")
-    return text.strip()
+        logging.error(f"PyMuPDF error: {e}")
+        return None
+
+def extract_text_from_pdf(pdf_path, dpi=OCR_DPI, max_workers=OCR_WORKERS):
+    """
+    Extracts text from a PDF page by page.
+    - Uses the PyMuPDF text layer where a page has one.
+    - OCRs only the remaining pages, one rasterized page per worker at a time.
+    """
+    pages = extract_text_layer(pdf_path)
+    if pages is None:
+        try:
+            pages = [""] * pdfinfo_from_path(pdf_path)["Pages"]
+        except Exception as e:
+            logging.error(f"Error extracting text: {e}")
+            return ""
+
+    scanned = [i for i, page_text in enumerate(pages) if len(page_text.strip()) < MIN_PAGE_TEXT_CHARS]
+    if scanned:
+        count_fallback("text_layer", "ocr", len(scanned))
+        # Each task renders its own page, so peak memory is bounded by max_workers
+        with stage("ocr"), ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(scanned)))) as executor:
+            ocr_texts = executor.map(lambda i: ocr_page(pdf_path, i + 1, dpi), scanned)
+            for i, page_text in zip(scanned, ocr_texts):
+                pages[i] = page_text
+
+    return "\n".join(page_text.strip() for page_text in pages).strip()
 
 def extract_skills(text):
     """
-    Extracts relevant skills from text using fuzzy matching and NLP.
+    Extracts relevant skills from text, tolerating small misspellings.
     """
-    doc = nlp(text.lower())
-    extracted_skills = set()
-    
-    for token in doc:
-        best_match, score = process.extractOne(token.text, SKILL_DATABASE)
-        if score > 80:  # High-confidence match
-            extracted_skills.add(best_match)
-    
-    return list(extracted_skills)
+    return get_skill_engine().extract(text, fuzzy=True)
 
 def extract_experience(text):
     """
-    Extracts years of experience from resume text using regex.
-    """
-    experience_patterns = [
-        r"(\d+)\s*(?:\+?\s*years?|yrs?|y)\s*(?:of\s*experience)?",
-        r"(\d+)\s*-\s*(\d+)\s*years?",
-        r"(\d+)\s*-\s*(present|current)",
-        r"(\d+)\s*(?:years?|yrs?)\s*plus"
-    ]
-    years = []
-    for pattern in experience_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            try:
-                if isinstance(match, tuple):
-                    start_year = int(match[0])
-                    end_year = datetime.now().year if match[1].lower() in ("present", "current") else int(match[1])
-                    years.append(end_year - start_year)
-                else:
-                    years.append(int(match))
-            except ValueError:
-                continue
-    return max(years) if years else 0
+    Extracts years of experience from resume text; ranges count as their length.
+    """
+    return analyze_resume(text).experience_span_years
 
 def ats_screening(resume_text):
     """
-    Checks ATS compatibility using keyword density (TF-IDF) instead of regex.
+    Checks ATS compatibility by looking for the required section headings.
     """
     required_sections = ["contact", "education", "experience", "skills"]
-    tfidf = TfidfVectorizer(stop_words='english')
-    tfidf_matrix = tfidf.fit_transform([resume_text])
-    keywords_found = sum(1 for word in required_sections if word in tfidf.get_feature_names_out())
+    headings = analyze_resume(resume_text).section_headings
+    keywords_found = sum(1 for word in required_sections if word in headings)
     ats_score = (keywords_found / len(required_sections)) * 100
     return round(ats_score, 2), "ATS-friendly" if ats_score > 70 else "Missing key sections"
 
@@ -100,13 +104,12 @@ def calculate_similarity(resume_text, job_description, skills, experience):
     """
     Computes similarity using BERT embeddings and TF-IDF weighting.
     """
-    embeddings = bert_model.encode([resume_text, job_description])
+    embeddings = encode_texts([resume_text, job_description])
     similarity_score = util.pytorch_cos_sim(embeddings[0], embeddings[1]).item()
     
     # TF-IDF Similarity
-    tfidf = TfidfVectorizer()
-    tfidf_matrix = tfidf.fit_transform([resume_text, job_description])
-    tfidf_similarity = (tfidf_matrix * tfidf_matrix.T).toarray()[0, 1]
+    with stage("tfidf"):
+        tfidf_similarity = get_tfidf_model().similarity(resume_text, job_description)
     
     # Skill matching
     skill_match_count = sum(1 for skill in skills if skill in job_description.lower())
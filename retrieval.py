@@ -0,0 +1,234 @@
+"""
+Two-stage screening of the stored resume pool against a job description.
+
+Stage one ranks every stored resume with an inverted index over its TF-IDF
+terms and extracted skills. The ranking score is the part of
+utils.weighted_score that needs no model inference (skill overlap, TF-IDF
+similarity, experience). Stage two loads the top candidates' stored
+features and runs the embedding similarity and the full weighted score
+(pipeline.rescore_features) on those candidates only.
+"""
+import os
+import threading
+import time
+from array import array
+from functools import lru_cache
+
+import numpy as np
+from scipy.sparse import csc_matrix, vstack
+
+from feature_store import iter_resume_features
+from tfidf_model import get_tfidf_model, term_counts
+
+# Candidates passed from the prefilter to full scoring
+RETRIEVAL_CANDIDATES = int(os.environ.get("RETRIEVAL_CANDIDATES", "200"))
+# How often the index picks up resumes stored since its last refresh
+RETRIEVAL_REFRESH_SECONDS = float(os.environ.get("RETRIEVAL_REFRESH_SECONDS", "60"))
+
+
+class _Segment:
+    """
+    Consecutive indexed rows: their ids, experience, and CSC document x term
+    (raw counts) and document x skill matrices.
+
+    Counts are stored without IDF, so a new IDF snapshot only recomputes the
+    row norms instead of rebuilding the matrices.
+    """
+
+    def __init__(self, ids, experience, terms, skills):
+        self.ids = ids
+        self.experience = experience
+        self.terms = terms
+        self.skills = skills
+        self.skills_per_resume = np.asarray(skills.sum(axis=1)).ravel()
+        self._norms = None  # (IDF version, TF-IDF row norms)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def merge(cls, older, newer):
+        return cls(
+            np.concatenate([older.ids, newer.ids]),
+            np.concatenate([older.experience, newer.experience]),
+            _vstack_columns(older.terms, newer.terms),
+            _vstack_columns(older.skills, newer.skills),
+        )
+
+    def norms(self, version, idf):
+        """L2 norms of the rows' TF-IDF vectors under `idf`, cached per IDF version."""
+        cached = self._norms
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        norms = np.sqrt(self.terms.power(2) @ (idf[:self.terms.shape[1]] ** 2))
+        norms[norms == 0] = 1.0
+        self._norms = (version, norms)
+        return norms
+
+
+def _widen(matrix, columns):
+    """A CSC matrix with empty columns appended up to `columns`, sharing the data."""
+    if matrix.shape[1] == columns:
+        return matrix
+    indptr = np.concatenate([matrix.indptr, np.full(columns - matrix.shape[1], matrix.indptr[-1])])
+    return csc_matrix((matrix.data, matrix.indices, indptr), shape=(matrix.shape[0], columns))
+
+
+def _vstack_columns(top, bottom):
+    # Later segments may know more terms and skills than earlier ones
+    columns = max(top.shape[1], bottom.shape[1])
+    return vstack([_widen(top, columns), _widen(bottom, columns)], format="csc")
+
+
+class CandidateIndex:
+    """
+    In-memory inverted index of the stored resumes.
+
+    Term counts and skills are kept as column-compressed (CSC) document x
+    term and document x skill matrices, so scoring a job description only
+    reads the postings of the terms and skills it contains. Each add()
+    appends a segment; segments are merged once the newer holds at least
+    half the postings of the older, which keeps O(log n) of them.
+    """
+
+    def __init__(self):
+        self.last_id = 0
+        self._terms = {}  # term -> column
+        self._skills = {}  # skill -> column
+        self._segments = []
+        self._rows = 0
+        self._idf = None  # (version, IDF of every term column)
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def __len__(self):
+        return self._rows
+
+    def add(self, rows):
+        """Indexes (resume_id, features) rows; ids must increase."""
+        if not rows:
+            return
+        ids, experience = array("q"), array("d")
+        term_rows, term_cols, term_counts_out = array("i"), array("i"), array("i")
+        skill_rows, skill_cols = array("i"), array("i")
+        with self._lock:
+            for row, (resume_id, features) in enumerate(rows):
+                ids.append(resume_id)
+                experience.append(features["experience_years"] or 0.0)
+                counts = features["term_counts"]
+                if counts is None:
+                    counts = term_counts(features["text"])
+                for term, count in counts.items():
+                    term_rows.append(row)
+                    term_cols.append(self._terms.setdefault(term, len(self._terms)))
+                    term_counts_out.append(count)
+                for skill in dict.fromkeys(features["skills"]):
+                    skill_rows.append(row)
+                    skill_cols.append(self._skills.setdefault(skill, len(self._skills)))
+
+            terms = csc_matrix(
+                (np.asarray(term_counts_out, dtype=np.float32),
+                 (np.frombuffer(term_rows, dtype=np.intc), np.frombuffer(term_cols, dtype=np.intc))),
+                shape=(len(ids), len(self._terms)),
+            )
+            skills = csc_matrix(
+                (np.ones(len(skill_rows), dtype=np.float32),
+                 (np.frombuffer(skill_rows, dtype=np.intc), np.frombuffer(skill_cols, dtype=np.intc))),
+                shape=(len(ids), len(self._skills)),
+            )
+            segments = self._segments + [_Segment(
+                np.frombuffer(ids, dtype=np.int64).copy(), np.frombuffer(experience, dtype=np.float64).copy(),
+                terms, skills,
+            )]
+            while len(segments) > 1 and segments[-2].terms.nnz <= 2 * segments[-1].terms.nnz:
+                newer = segments.pop()
+                segments.append(_Segment.merge(segments.pop(), newer))
+            # Readers take the list as a snapshot, so it is replaced, never mutated
+            self._segments = segments
+            self._rows += len(ids)
+            self.last_id = max(self.last_id, ids[-1])
+
+    def refresh(self, db, max_age=RETRIEVAL_REFRESH_SECONDS):
+        """Indexes resumes stored since the last refresh, at most every `max_age` seconds."""
+        with self._refresh_lock:
+            if self._refreshed_at is not None and time.monotonic() - self._refreshed_at < max_age:
+                return
+            for rows in iter_resume_features(db, after_id=self.last_id):
+                self.add([(resume_id, features) for resume_id, _, features in rows])
+            self._refreshed_at = time.monotonic()
+
+    def _snapshot(self):
+        """The current segments and the IDF of every term column, recomputed when the model changes."""
+        model = get_tfidf_model()
+        with self._lock:
+            segments = self._segments
+            version = (len(self._terms), model.documents, len(model.df))
+            if self._idf is None or self._idf[0] != version:
+                idf = model.idf(list(self._terms))
+                # model.idf may just have reloaded the frequencies
+                self._idf = ((len(self._terms), model.documents, len(model.df)), idf)
+            return segments, self._idf
+
+    def prefilter_scores(self, job_description):
+        """
+        Lexical part of the weighted match score for every indexed resume.
+
+        Returns (ids, scores) as parallel arrays.
+        """
+        segments, (version, idf) = self._snapshot()
+        if not segments:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        model = get_tfidf_model()
+
+        # TF-IDF cosine; the query norm covers all of its terms, indexed or not
+        query = term_counts(job_description)
+        query_terms = list(query)
+        query_weights = np.fromiter(query.values(), dtype=np.float64, count=len(query)) * model.idf(query_terms)
+        query_norm = np.linalg.norm(query_weights) or 1.0
+        # Columns added after the IDF snapshot are in no segment it covers
+        known = [
+            (self._terms[term], weight) for term, weight in zip(query_terms, query_weights)
+            if self._terms.get(term, len(idf)) < len(idf)
+        ]
+        term_cols = np.asarray([col for col, _ in known], dtype=np.int64)
+        # Stored counts carry no IDF, so it is applied on the query side
+        term_weights = np.asarray([weight for _, weight in known]) * idf[term_cols] / query_norm
+
+        # Same skill test as utils.weighted_score: skill name found in the job description
+        lowered = job_description.lower()
+        skill_cols = np.asarray([col for skill, col in list(self._skills.items()) if skill in lowered], dtype=np.int64)
+
+        ids, scores = [], []
+        for segment in segments:
+            in_segment = term_cols < segment.terms.shape[1]
+            tfidf = np.zeros(len(segment))
+            if in_segment.any():
+                tfidf = (segment.terms[:, term_cols[in_segment]] @ term_weights[in_segment]) / segment.norms(version, idf)
+
+            segment_skills = skill_cols[skill_cols < segment.skills.shape[1]]
+            matches = np.asarray(segment.skills[:, segment_skills].sum(axis=1)).ravel() if len(segment_skills) else np.zeros(len(segment))
+            skill_weight = np.divide(
+                matches, segment.skills_per_resume, out=np.zeros(len(segment)), where=segment.skills_per_resume > 0
+            )
+
+            exp_weight = np.minimum(segment.experience / 10, 1) * 0.2
+            ids.append(segment.ids)
+            scores.append((0.3 * skill_weight) + (0.2 * tfidf) + (0.1 * exp_weight))
+        return np.concatenate(ids), np.concatenate(scores)
+
+    def candidates(self, job_description, k=RETRIEVAL_CANDIDATES):
+        """Ids of the top-k resumes by prefilter score, best first."""
+        ids, scores = self.prefilter_scores(job_description)
+        if not len(scores):
+            return []
+        k = min(k, len(scores))
+        best = np.argpartition(scores, -k)[-k:]
+        best = best[np.argsort(-scores[best])]
+        return ids[best].tolist()
+
+
+@lru_cache(maxsize=1)
+def get_candidate_index():
+    """Returns the process-wide candidate index."""
+    return CandidateIndex()
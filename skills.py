@@ -0,0 +1,158 @@
+import json
+import os
+import re
+from functools import lru_cache
+
+SKILL_TAXONOMY_PATH = os.environ.get(
+    "SKILL_TAXONOMY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_taxonomy.json")
+)
+
+# Keeps symbols that are part of skill names: c++, c#, node.js
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+# Trie key marking the end of a skill phrase; tokens are never empty
+_END = ""
+
+
+def tokenize(text):
+    """Lowercases text and returns its (token, start, end) triples."""
+    return [(m.group(), m.start(), m.end()) for m in TOKEN_PATTERN.finditer(text.lower())]
+
+
+def _deletes(word, max_edits):
+    """All strings reachable from `word` by deleting up to `max_edits` characters."""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_edits):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+def _within_distance(a, b, max_edits):
+    """
+    Edit distance between a and b (adjacent transpositions count as one edit)
+    if it is <= max_edits, else None.
+    """
+    if abs(len(a) - len(b)) > max_edits:
+        return None
+    before_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i]
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            distance = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                distance = min(distance, before_previous[j - 2] + 1)
+            current.append(distance)
+        # A transposition can reach back two rows, so both must exceed the bound
+        if min(current) > max_edits and min(previous) > max_edits:
+            return None
+        before_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_edits else None
+
+
+class SkillEngine:
+    """
+    Multi-pattern skill matcher compiled from a taxonomy of skills and aliases.
+
+    Every skill phrase is stored in a token trie, so a text is matched in one
+    left-to-right pass (leftmost-longest). Fuzzy matching maps each text token
+    to a taxonomy token within `max_edits` edits using a precomputed deletion
+    index, which costs the same no matter how many skills are loaded.
+    """
+
+    def __init__(self, taxonomy, max_edits=1, min_fuzzy_length=5):
+        self.max_edits = max_edits
+        self.min_fuzzy_length = min_fuzzy_length
+        self.skills = []
+        self._trie = {}
+        vocabulary = set()
+
+        for entry in taxonomy:
+            name = entry["name"].lower()
+            self.skills.append(name)
+            for phrase in [name] + [alias.lower() for alias in entry.get("aliases", [])]:
+                tokens = [token for token, _, _ in tokenize(phrase)]
+                if not tokens:
+                    continue
+                node = self._trie
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node[_END] = name
+                vocabulary.update(tokens)
+
+        self._vocabulary = vocabulary
+        self._deletion_index = {}
+        for word in vocabulary:
+            if len(word) >= min_fuzzy_length:
+                for variant in _deletes(word, max_edits):
+                    self._deletion_index.setdefault(variant, set()).add(word)
+        self._resolved = {}
+
+    def _resolve_fuzzy(self, token):
+        """Closest taxonomy token within max_edits of `token`, or None."""
+        if token in self._resolved:
+            return self._resolved[token]
+        best = None
+        if len(token) >= self.min_fuzzy_length and not token.isdigit():
+            candidates = set()
+            for variant in _deletes(token, self.max_edits):
+                candidates |= self._deletion_index.get(variant, set())
+            scored = []
+            for candidate in candidates:
+                distance = _within_distance(token, candidate, self.max_edits)
+                if distance is not None:
+                    scored.append((distance, candidate))
+            if scored:
+                best = min(scored)[1]
+        if len(self._resolved) < 100000:
+            self._resolved[token] = best
+        return best
+
+    def find(self, text, fuzzy=False):
+        """Returns (skill, start, end) for every skill mention in the text."""
+        tokens = tokenize(text)
+        resolved = []
+        for token, _, _ in tokens:
+            if token in self._vocabulary:
+                resolved.append(token)
+            elif fuzzy:
+                resolved.append(self._resolve_fuzzy(token))
+            else:
+                resolved.append(None)
+
+        matches = []
+        i = 0
+        while i < len(tokens):
+            node = self._trie
+            longest = None
+            j = i
+            while j < len(tokens) and resolved[j] in node:
+                node = node[resolved[j]]
+                j += 1
+                if _END in node:
+                    longest = (node[_END], j)
+            if longest:
+                skill, end = longest
+                matches.append((skill, tokens[i][1], tokens[end - 1][2]))
+                i = end
+            else:
+                i += 1
+        return matches
+
+    def extract(self, text, fuzzy=False):
+        """Returns the distinct skills mentioned in the text, in order of appearance."""
+        return list(dict.fromkeys(skill for skill, _, _ in self.find(text, fuzzy=fuzzy)))
+
+
+def load_taxonomy(path=SKILL_TAXONOMY_PATH):
+    with open(path) as f:
+        return json.load(f)["skills"]
+
+
+@lru_cache(maxsize=1)
+def get_skill_engine():
+    """Returns the shared engine compiled from the skill taxonomy file."""
+    return SkillEngine(load_taxonomy())
@@ -0,0 +1,97 @@
+"""
+Running aggregates for the admin dashboard.
+
+Counters and per-skill frequencies are updated in the same transaction as
+the rows they describe, so reading them is O(1) in the number of resumes.
+If they ever drift, recompute them from the source tables:
+
+    python stats.py --rebuild
+"""
+import argparse
+from collections import Counter
+
+from sqlalchemy import func
+
+from database import SessionLocal, Resume, ResumeSkill, Feedback, StatCounter, SkillCount, add_counts
+
+RESUME_COUNT = "resume_count"
+MATCH_SCORE_SUM = "match_score_sum"
+MATCH_SCORE_COUNT = "match_score_count"
+FEEDBACK_COUNT = "feedback_count"
+RATING_SUM = "rating_sum"
+
+
+def record_resumes(db, resumes):
+    """Counts new Resume rows; call before the commit that inserts them."""
+    scores = [r.match_score for r in resumes if r.match_score is not None]
+    add_counts(db, StatCounter, "name", "value", {
+        RESUME_COUNT: len(resumes),
+        MATCH_SCORE_SUM: float(sum(scores)),
+        MATCH_SCORE_COUNT: len(scores),
+    })
+    skill_counts = Counter(skill for r in resumes for skill in dict.fromkeys(r.get_skills()))
+    add_counts(db, SkillCount, "skill", "count", dict(skill_counts))
+
+
+def record_feedback(db, rating):
+    """Counts a new Feedback row; call before the commit that inserts it."""
+    add_counts(db, StatCounter, "name", "value", {FEEDBACK_COUNT: 1, RATING_SUM: float(rating)})
+
+
+def read_stats(db, top_n=5):
+    counters = dict(db.query(StatCounter.name, StatCounter.value).all())
+    score_count = counters.get(MATCH_SCORE_COUNT, 0)
+    feedback_count = counters.get(FEEDBACK_COUNT, 0)
+    top_skills = (
+        db.query(SkillCount.skill, SkillCount.count)
+        .filter(SkillCount.count > 0)
+        .order_by(SkillCount.count.desc(), SkillCount.skill)
+        .limit(top_n)
+        .all()
+    )
+    return {
+        "total_resumes": int(counters.get(RESUME_COUNT, 0)),
+        "average_match_score": round(counters.get(MATCH_SCORE_SUM, 0) / score_count, 2) if score_count else 0.0,
+        "recruiter_average_rating": round(counters.get(RATING_SUM, 0) / feedback_count, 2) if feedback_count else 0.0,
+        "top_skills": [(skill, count) for skill, count in top_skills],
+        "feedback_count": int(feedback_count),
+    }
+
+
+def is_initialized(db):
+    return db.query(StatCounter).filter(StatCounter.name == RESUME_COUNT).first() is not None
+
+
+def rebuild(db):
+    """Recomputes every aggregate from the source tables."""
+    resume_count, score_sum, score_count = db.query(
+        func.count(Resume.id), func.coalesce(func.sum(Resume.match_score), 0.0), func.count(Resume.match_score)
+    ).one()
+    feedback_count, rating_sum = db.query(func.count(Feedback.id), func.coalesce(func.sum(Feedback.rating), 0.0)).one()
+
+    db.query(StatCounter).delete()
+    db.query(SkillCount).delete()
+    db.add_all([
+        StatCounter(name=RESUME_COUNT, value=resume_count),
+        StatCounter(name=MATCH_SCORE_SUM, value=score_sum),
+        StatCounter(name=MATCH_SCORE_COUNT, value=score_count),
+        StatCounter(name=FEEDBACK_COUNT, value=feedback_count),
+        StatCounter(name=RATING_SUM, value=rating_sum),
+    ])
+    skill_counts = db.query(ResumeSkill.skill, func.count()).group_by(ResumeSkill.skill).all()
+    db.add_all([SkillCount(skill=skill, count=count) for skill, count in skill_counts])
+    db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dashboard aggregates")
+    parser.add_argument("--rebuild", action="store_true", help="recompute aggregates from the resume and feedback tables")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            rebuild(db)
+        print(read_stats(db))
+    finally:
+        db.close()
@@ -0,0 +1,216 @@
+"""
+Shared TF-IDF model over the stored resume and job description corpus.
+
+Document frequencies live in the tfidf_terms table and are updated
+incrementally, in the same transaction as the resumes and job descriptions
+they count (each distinct document once, tracked in tfidf_documents). Every
+process keeps an in-memory snapshot of the frequencies and reloads it every
+TFIDF_REFRESH_SECONDS, so scoring a pair is tokenization, a few dictionary
+lookups and one sparse dot product instead of fitting a vectorizer.
+
+IDF uses the same smoothed formula as sklearn's TfidfVectorizer:
+idf(t) = ln((1 + n) / (1 + df(t))) + 1. To recompute the frequencies from
+the stored features and job descriptions:
+
+    python tfidf_model.py --rebuild
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from database import SessionLocal, Resume, ResumeFeatures, TfidfDocument, TfidfTerm, add_counts, dialect_insert
+from embedding_cache import normalize_text
+
+# How often each process reloads document frequencies from the database
+TFIDF_REFRESH_SECONDS = float(os.environ.get("TFIDF_REFRESH_SECONDS", "300"))
+# Rows read per query by rebuild()
+REBUILD_CHUNK_ROWS = 1000
+
+# Same tokenization as the per-pair vectorizers this model replaces
+_analyze = TfidfVectorizer().build_analyzer()
+
+
+def term_counts(text):
+    """Raw term counts of a document, as stored in ResumeFeatures.term_counts."""
+    return dict(Counter(_analyze(text)))
+
+
+def document_hash(text):
+    """Corpus key of a job description (uploads use the hash of their bytes)."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def pack_counts(counts):
+    return zlib.compress(json.dumps(counts).encode("utf-8"))
+
+
+def unpack_counts(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class TfidfModel:
+    """Snapshot of the corpus document frequencies, refreshed periodically."""
+
+    def __init__(self, refresh_seconds=TFIDF_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.documents = 0
+        self.df = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Reloads document frequencies from the database."""
+        db = SessionLocal()
+        try:
+            documents = db.query(TfidfDocument).count()
+            df = dict(db.query(TfidfTerm.term, TfidfTerm.df).filter(TfidfTerm.df > 0))
+        finally:
+            db.close()
+        self.documents, self.df = documents, df
+        self._loaded_at = time.monotonic()
+
+    def _ensure_fresh(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            with self._lock:
+                if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+                    self.refresh()
+
+    def idf(self, terms):
+        """Smoothed IDF of each term; unseen terms get the maximum."""
+        self._ensure_fresh()
+        df = np.fromiter((self.df.get(term, 0) for term in terms), dtype=np.float64, count=len(terms))
+        return np.log((1 + self.documents) / (1 + df)) + 1
+
+    def transform(self, counts_list):
+        """
+        L2-normalized TF-IDF rows for a list of term-count dicts.
+
+        Columns are the union of the documents' terms; returns (matrix, vocabulary).
+        """
+        vocabulary = {}
+        indices, data, indptr = [], [], [0]
+        for counts in counts_list:
+            for term, count in counts.items():
+                indices.append(vocabulary.setdefault(term, len(vocabulary)))
+                data.append(count)
+            indptr.append(len(indices))
+        indices = np.asarray(indices, dtype=np.int64)
+        data = np.asarray(data, dtype=np.float64) * self.idf(list(vocabulary))[indices]
+        matrix = csr_matrix((data, indices, indptr), shape=(len(counts_list), len(vocabulary)))
+        return normalize(matrix), vocabulary
+
+    def similarities(self, counts_list, query_counts):
+        """Cosine similarity of every document's TF-IDF vector with the query's."""
+        if not counts_list:
+            return np.zeros(0)
+        matrix, _ = self.transform(list(counts_list) + [query_counts])
+        return (matrix[:-1] @ matrix[-1].T).toarray().ravel()
+
+    def similarity(self, text, query):
+        return float(self.similarities([term_counts(text)], term_counts(query))[0])
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_tfidf_model():
+    """Returns the process-wide TF-IDF model."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = TfidfModel()
+    return _model
+
+
+def record_documents(db, documents):
+    """
+    Adds documents to the corpus; call before the commit that stores them.
+
+    `documents` maps a document hash to its term counts. Documents already in
+    the corpus are skipped, so each distinct resume or job description
+    counts once however often it is scored.
+    """
+    if not documents:
+        return
+    # Only the rows this statement actually inserted count, so concurrent
+    # writers recording the same document bump df once between them
+    stmt = (
+        dialect_insert(db)(TfidfDocument)
+        .on_conflict_do_nothing(index_elements=["doc_hash"])
+        .returning(TfidfDocument.doc_hash)
+    )
+    inserted = set(db.execute(stmt, [{"doc_hash": doc_hash} for doc_hash in documents]).scalars())
+    if not inserted:
+        return
+    add_counts(db, TfidfTerm, "term", "df", dict(Counter(term for doc_hash in inserted for term in documents[doc_hash])))
+
+
+def record_job_description(db, job_description):
+    record_documents(db, {document_hash(job_description): term_counts(job_description)})
+
+
+def is_initialized(db):
+    return db.query(TfidfDocument).first() is not None
+
+
+def rebuild(db):
+    """Recomputes the corpus from stored resume features and job descriptions."""
+    db.query(TfidfDocument).delete()
+    db.query(TfidfTerm).delete()
+
+    last_hash = ""
+    while True:
+        rows = (
+            db.query(ResumeFeatures.content_hash, ResumeFeatures.text, ResumeFeatures.term_counts)
+            .filter(ResumeFeatures.content_hash > last_hash)
+            .order_by(ResumeFeatures.content_hash)
+            .limit(REBUILD_CHUNK_ROWS)
+            .all()
+        )
+        if not rows:
+            break
+        record_documents(db, {
+            content_hash: unpack_counts(counts) if counts is not None
+            else term_counts(zlib.decompress(text).decode("utf-8"))
+            for content_hash, text, counts in rows
+        })
+        last_hash = rows[-1][0]
+
+    job_descriptions = db.query(Resume.job_description).filter(Resume.job_description.isnot(None)).distinct().all()
+    documents = {}
+    for (job_description,) in job_descriptions:
+        documents[document_hash(job_description)] = term_counts(job_description)
+        if len(documents) >= REBUILD_CHUNK_ROWS:
+            record_documents(db, documents)
+            documents = {}
+    record_documents(db, documents)
+    db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Corpus TF-IDF model")
+    parser.add_argument("--rebuild", action="store_true", help="recompute document frequencies from stored data")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            rebuild(db)
+        print({
+            "documents": db.query(TfidfDocument).count(),
+            "terms": db.query(TfidfTerm).count(),
+        })
+    finally:
+        db.close()
@@ -0,0 +1,60 @@
+import hashlib
+import os
+import tempfile
+
+UPLOAD_DIR = "uploaded_files"
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_MB", "20")) * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES."""
+
+    def __init__(self, max_bytes=MAX_UPLOAD_BYTES):
+        super().__init__(f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit")
+        self.max_bytes = max_bytes
+
+
+def content_path(sha256, file_ext):
+    """Content-addressed location of an upload: uploaded_files/ab/abcdef....pdf"""
+    return os.path.join(UPLOAD_DIR, sha256[:2], f"{sha256}.{file_ext}")
+
+
+def content_hash_of(path):
+    """The SHA-256 a content-addressed upload path was named after."""
+    return os.path.basename(path).split(".", 1)[0]
+
+
+async def save_upload(file, file_ext, max_bytes=MAX_UPLOAD_BYTES):
+    """
+    Streams an UploadFile to disk in fixed-size chunks while hashing it.
+
+    Returns (sha256, path). Identical uploads map to the same path, so a file
+    that was already stored is not written again.
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    hasher = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while chunk := await file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                hasher.update(chunk)
+                f.write(chunk)
+
+        sha256 = hasher.hexdigest()
+        path = content_path(sha256, file_ext)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        return sha256, path
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
@@ -0,0 +1,194 @@
+"""
+Memory-mapped index of resume embeddings used by /search.
+
+Resumes are added as they are stored. To index resumes stored before the
+index existed (or after deleting its files), rebuild it from the stored
+features while the API is stopped:
+
+    python vector_index.py --rebuild
+"""
+import argparse
+import fcntl
+import json
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+VECTOR_INDEX_PATH = os.environ.get("VECTOR_INDEX_PATH", "./resume_vectors")
+
+# Rows scored per matrix-vector product; bounds the temporary score buffer
+SEARCH_CHUNK_ROWS = 65536
+
+
+def normalize_rows(vectors):
+    """L2-normalizes each row so dot products are cosine similarities."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class VectorIndex:
+    """
+    Append-only, memory-mapped matrix of normalized resume embeddings.
+
+    Vectors are stored row by row in `<path>.f32` and the matching
+    `Resume.id`s in `<path>.ids`. Searches map the files read-only, so the
+    matrix is paged in by the OS instead of being loaded into Python objects.
+    """
+
+    def __init__(self, path=VECTOR_INDEX_PATH):
+        self.vectors_path = path + ".f32"
+        self.ids_path = path + ".ids"
+        self.meta_path = path + ".json"
+        self._lock = threading.Lock()
+        self._dim = None
+        self._mapped = (0, None, None)
+
+    @property
+    def dim(self):
+        if self._dim is None and os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                self._dim = json.load(f)["dim"]
+        return self._dim
+
+    def __len__(self):
+        if self.dim is None or not os.path.exists(self.ids_path):
+            return 0
+        rows = os.path.getsize(self.vectors_path) // (4 * self.dim)
+        return min(rows, os.path.getsize(self.ids_path) // 8)
+
+    def add(self, ids, vectors):
+        """Appends normalized vectors for the given resume ids."""
+        vectors = normalize_rows(vectors)
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+        if len(ids) == 0:
+            return
+
+        with self._lock, open(self.ids_path, "ab") as ids_file:
+            # The ids file doubles as the cross-process lock for appends
+            fcntl.flock(ids_file, fcntl.LOCK_EX)
+            try:
+                if self.dim is None:
+                    with open(self.meta_path, "w") as f:
+                        json.dump({"dim": int(vectors.shape[1])}, f)
+                    self._dim = int(vectors.shape[1])
+                elif vectors.shape[1] != self.dim:
+                    raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+
+                # Drop rows left behind by an append that failed between the two
+                # writes, so the next id lines up with its vector again
+                id_rows = os.path.getsize(self.ids_path) // 8
+                if os.path.getsize(self.ids_path) != id_rows * 8:
+                    os.truncate(self.ids_path, id_rows * 8)
+                if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) > id_rows * self.dim * 4:
+                    os.truncate(self.vectors_path, id_rows * self.dim * 4)
+
+                # Vectors are written before ids, so a reader never sees an id without its row
+                with open(self.vectors_path, "ab") as vectors_file:
+                    vectors_file.write(vectors.tobytes())
+                    vectors_file.flush()
+                ids_file.write(ids.tobytes())
+                ids_file.flush()
+            finally:
+                fcntl.flock(ids_file, fcntl.LOCK_UN)
+
+    def _open(self):
+        """Returns (ids, vectors) memmaps, remapping when other writers have appended."""
+        rows = len(self)
+        if rows == 0:
+            return None, None
+        mapped_rows, ids, vectors = self._mapped
+        if mapped_rows != rows:
+            ids = np.memmap(self.ids_path, dtype=np.int64, mode="r", shape=(rows,))
+            vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+            self._mapped = (rows, ids, vectors)
+        return ids, vectors
+
+    def search(self, query, top_k=10):
+        """
+        Returns [(resume_id, cosine_similarity)] for the `top_k` closest rows.
+        """
+        ids, vectors = self._open()
+        if ids is None or top_k <= 0:
+            return []
+        query = normalize_rows(query)[0]
+
+        candidate_rows = []
+        candidate_scores = []
+        for start in range(0, len(ids), SEARCH_CHUNK_ROWS):
+            scores = vectors[start:start + SEARCH_CHUNK_ROWS] @ query
+            if len(scores) > top_k:
+                best = np.argpartition(scores, -top_k)[-top_k:]
+            else:
+                best = np.arange(len(scores))
+            candidate_rows.append(best + start)
+            candidate_scores.append(scores[best])
+
+        rows = np.concatenate(candidate_rows)
+        scores = np.concatenate(candidate_scores)
+        if len(scores) > top_k:
+            best = np.argpartition(scores, -top_k)[-top_k:]
+            rows, scores = rows[best], scores[best]
+        order = np.argsort(-scores)
+        return [(int(ids[rows[i]]), float(scores[i])) for i in order]
+
+
+def rebuild(db, path=VECTOR_INDEX_PATH):
+    """
+    Rewrites the index from the embeddings in resume_features.
+
+    Resumes without stored features, or whose stored embedding came from
+    another model or profile, are skipped. Returns (indexed, skipped).
+    """
+    from sqlalchemy import func
+
+    from database import Resume
+    from feature_store import iter_resume_features
+
+    index = VectorIndex(path + ".rebuild")
+    for stale in (index.vectors_path, index.ids_path, index.meta_path):
+        if os.path.exists(stale):
+            os.remove(stale)
+    indexed = 0
+    for rows in iter_resume_features(db):
+        rows = [(resume_id, features["embedding"]) for resume_id, _, features in rows if features["embedding"] is not None]
+        if rows:
+            index.add([resume_id for resume_id, _ in rows], [embedding for _, embedding in rows])
+            indexed += len(rows)
+    skipped = db.query(func.count(Resume.id)).scalar() - indexed
+
+    target = VectorIndex(path)
+    for built, final in ((index.meta_path, target.meta_path), (index.vectors_path, target.vectors_path),
+                         (index.ids_path, target.ids_path)):
+        if os.path.exists(built):
+            os.replace(built, final)
+    get_vector_index.cache_clear()
+    return indexed, skipped
+
+
+@lru_cache(maxsize=1)
+def get_vector_index():
+    """Returns the process-wide resume vector index."""
+    return VectorIndex()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resume vector index")
+    parser.add_argument("--rebuild", action="store_true", help="rewrite the index from stored resume features")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        from database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            indexed, skipped = rebuild(db)
+        finally:
+            db.close()
+        print({"indexed": indexed, "skipped": skipped})
+    print({"rows": len(get_vector_index())})
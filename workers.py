@@ -0,0 +1,110 @@
+import asyncio
+import contextvars
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+
+import model_registry
+
+# "thread" shares the loaded models with the API process; "process" isolates
+# CPU-bound work from the GIL at the cost of one model copy per worker.
+WORKER_POOL = os.environ.get("WORKER_POOL", "thread")
+WORKER_COUNT = int(os.environ.get("WORKER_COUNT", str(os.cpu_count() or 1)))
+# Tasks allowed to wait or run at once before new work is rejected
+WORKER_QUEUE_SIZE = int(os.environ.get("WORKER_QUEUE_SIZE", str(WORKER_COUNT * 4)))
+RETRY_AFTER_SECONDS = int(os.environ.get("RETRY_AFTER_SECONDS", "5"))
+
+
+def _default_torch_threads():
+    # Split the cores between workers so they do not oversubscribe; in thread
+    # mode every concurrent forward pass still gets its own OpenMP team
+    return max(1, (os.cpu_count() or 1) // WORKER_COUNT)
+
+TORCH_THREADS = int(os.environ.get("TORCH_THREADS", str(_default_torch_threads())))
+# Threads for running independent torch operators in parallel; 0 keeps torch's default
+TORCH_INTEROP_THREADS = int(os.environ.get("TORCH_INTEROP_THREADS", "0"))
+
+
+class PoolSaturated(Exception):
+    """Raised when the admission queue of the worker pool is full."""
+
+    def __init__(self, retry_after=RETRY_AFTER_SECONDS):
+        super().__init__("Worker pool is saturated")
+        self.retry_after = retry_after
+
+
+def configure_torch_threads():
+    model_registry.configure_torch_threads(TORCH_THREADS, TORCH_INTEROP_THREADS)
+
+
+def _init_process_worker():
+    """Runs once in every process worker: tunes torch and loads the models."""
+    configure_torch_threads()
+    model_registry.warm_up()
+
+
+class WorkerPool:
+    """
+    Runs CPU-bound functions off the event loop with bounded admission.
+
+    At most `max_pending` tasks may be queued or running; further calls raise
+    PoolSaturated immediately instead of growing the queue without limit.
+    """
+
+    def __init__(self, kind=WORKER_POOL, workers=WORKER_COUNT, max_pending=WORKER_QUEUE_SIZE):
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max(max_pending, workers)
+        self.pending = 0
+        if kind == "process":
+            # Spawn, not fork: the API process may hold the model registry lock
+            # (warm-up thread) and open SQLite handles, neither safe to inherit
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_process_worker,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        elif kind == "thread":
+            configure_torch_threads()
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cpu-worker")
+        else:
+            raise ValueError(f"Unknown worker pool kind: {kind}")
+
+    async def run(self, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs) in the pool and awaits its result."""
+        # The event loop is single-threaded, so this check-and-increment is atomic
+        if self.pending >= self.max_pending:
+            raise PoolSaturated()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            call = partial(fn, *args, **kwargs)
+            if self.kind == "thread":
+                # Carry the request context (e.g. Server-Timing collection) into the thread
+                call = partial(contextvars.copy_context().run, call)
+            return await loop.run_in_executor(self._executor, call)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        logging.info(f"Shutting down {self.kind} worker pool")
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+
+
+def get_worker_pool():
+    """Returns the process-wide worker pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = WorkerPool()
+    return _pool
+
+
+def shutdown_worker_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
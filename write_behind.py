@@ -0,0 +1,159 @@
+"""
+Group commit of scored resumes.
+
+With WRITE_BEHIND=1, /match-resume/ hands its result to a single committer
+thread instead of committing on its own. The committer gathers everything
+submitted within WRITE_BEHIND_MAX_DELAY_MS of the first pending result (up
+to WRITE_BEHIND_MAX_BATCH results) and stores the group in one transaction,
+so concurrent uploads share one fsync and never contend for the SQLite
+write lock. Each request still waits for its own commit, so the id it
+returns is durable; the extra latency is bounded by the delay.
+"""
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from database import SessionLocal
+from pipeline import store_scored
+from vector_index import get_vector_index
+import metrics
+
+WRITE_BEHIND = os.environ.get("WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_MAX_BATCH = int(os.environ.get("WRITE_BEHIND_MAX_BATCH", "64"))
+WRITE_BEHIND_MAX_DELAY_MS = float(os.environ.get("WRITE_BEHIND_MAX_DELAY_MS", "20"))
+
+GROUP_SIZE = metrics.Histogram(
+    "resume_matcher_write_behind_group_size", "Results stored per grouped transaction.", [],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+_STOP = object()
+
+
+def _set_result(future, result):
+    # A request that was cancelled while waiting has already resolved its future
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_exception(future, exception):
+    if not future.done():
+        future.set_exception(exception)
+
+
+class WriteBehindCommitter:
+    """Stores submitted results from one background thread, one transaction per group."""
+
+    def __init__(self, max_batch=WRITE_BEHIND_MAX_BATCH, max_delay_ms=WRITE_BEHIND_MAX_DELAY_MS):
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def submit(self, entry):
+        """
+        Queues one store_scored entry; returns a Future of its resume id.
+
+        The Future resolves after the group's commit and vector index update.
+        """
+        future = Future()
+        self._queue.put((entry, future))
+        return future
+
+    async def store(self, entry):
+        return await asyncio.wrap_future(self.submit(entry))
+
+    def close(self):
+        """Commits everything already submitted, then stops the thread."""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            group = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(group) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                group.append(item)
+            try:
+                self._commit(group)
+            except Exception as e:
+                # Fail this group's requests but keep the only committer thread alive
+                logging.exception("Write-behind group failed")
+                for _, future in group:
+                    _set_exception(future, e)
+
+    def _commit(self, group):
+        db = SessionLocal()
+        try:
+            try:
+                stored = list(zip(group, store_scored(db, [entry for entry, _ in group])))
+                db.commit()
+            except Exception:
+                # Store the results one by one so a single bad row fails only its own request
+                logging.exception("Grouped commit failed; retrying results individually")
+                db.rollback()
+                stored = []
+                for entry, future in group:
+                    try:
+                        resumes = store_scored(db, [entry])
+                        db.commit()
+                        stored.append(((entry, future), resumes[0]))
+                    except Exception as e:
+                        db.rollback()
+                        _set_exception(future, e)
+            if not stored:
+                return
+            GROUP_SIZE.observe(len(stored))
+            try:
+                get_vector_index().add([resume.id for _, resume in stored], [entry[3] for (entry, _), _ in stored])
+            except Exception as e:
+                # Same outcome as the direct path: rows committed, request fails
+                for (_, future), _ in stored:
+                    _set_exception(future, e)
+                return
+            for (_, future), resume in stored:
+                _set_result(future, resume.id)
+        finally:
+            db.close()
+
+
+_committer = None
+_committer_lock = threading.Lock()
+
+
+def get_committer():
+    """Returns the process-wide committer, starting it on first use."""
+    global _committer
+    if _committer is None:
+        with _committer_lock:
+            if _committer is None:
+                _committer = WriteBehindCommitter()
+    return _committer
+
+
+def shutdown_committer():
+    global _committer
+    with _committer_lock:
+        if _committer is not None:
+            _committer.close()
+            _committer = None